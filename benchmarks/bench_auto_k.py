@@ -0,0 +1,68 @@
+"""
+Compares choosing k with a naive sweep (one full KMeans fit per k, scored on the
+full data) against TopicClusterer's auto_k mode (parallel fits on a stratified
+sample, then one warm-started full fit). First checks that inputs too small to
+score any k still get clustered.
+
+Run from the project root:
+    python -m benchmarks.bench_auto_k [rows] [max_k]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+from benchmarks.synthetic import generate_texts
+from src.clustering import TopicClusterer
+from src.features import BatchFeatures
+from src.preprocessor import Preprocessor
+
+
+def check_tiny_inputs():
+    texts = Preprocessor().process_batch(pd.Series(generate_texts(3))).tolist()
+    # rows -> (k, number of scored candidates); below 3 rows no k can be scored
+    for rows, expected in ((1, (1, 0)), (2, (2, 0)), (3, (2, 1))):
+        clusterer = TopicClusterer(n_clusters="auto")
+        labels = clusterer.cluster(texts[:rows])
+        assert len(labels) == rows, labels
+        assert (clusterer.n_clusters, len(clusterer.k_scores)) == expected, (rows, clusterer.n_clusters)
+    print("auto k on 1, 2 and 3 rows: ok")
+
+
+def main():
+    check_tiny_inputs()
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    max_k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    texts = Preprocessor().process_batch(pd.Series(generate_texts(rows))).tolist()
+    features = BatchFeatures.from_texts(texts)
+
+    matrix = TopicClusterer(n_clusters=2).fit_vectorizer(texts, features)
+    # silhouette on every row is quadratic; even the naive sweep has to sample it
+    scored = np.random.default_rng(0).choice(rows, min(rows, 10000), replace=False)
+    start = time.perf_counter()
+    naive = {}
+    for k in range(2, max_k + 1):
+        labels = KMeans(n_clusters=k, random_state=42, n_init='auto').fit_predict(matrix)
+        naive[k] = silhouette_score(matrix[scored], labels[scored])
+    naive_time = time.perf_counter() - start
+    naive_k = max(naive, key=naive.get)
+
+    start = time.perf_counter()
+    clusterer = TopicClusterer(n_clusters="auto", k_range=(2, max_k))
+    clusterer.cluster(texts, features=features)
+    auto_time = time.perf_counter() - start
+
+    print(f"{rows} rows, k in 2..{max_k}")
+    print(f"naive full-fit sweep: {naive_time:6.2f}s, best silhouette at k={naive_k}")
+    print(f"auto_k (sampled):     {auto_time:6.2f}s, selected k={clusterer.n_clusters} "
+          f"({naive_time / auto_time:.1f}x faster)")
+    for score in clusterer.k_scores:
+        print(f"  k={score['k']:2d} silhouette {score['silhouette']:.3f} "
+              f"davies-bouldin {score['davies_bouldin']:.3f} ({score['seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
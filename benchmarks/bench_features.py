@@ -0,0 +1,47 @@
+"""
+Compares sentiment + clustering with separate vectorizers (each tokenizing the batch)
+against one shared BatchFeatures tokenization consumed by both.
+
+Run from the project root:
+    python -m benchmarks.bench_features [rows]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_texts
+from src.clustering import TopicClusterer
+from src.features import BatchFeatures
+from src.preprocessor import Preprocessor
+from src.sentiment_analyzer import SentimentAnalyzer
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    texts = Preprocessor().process_batch(pd.Series(generate_texts(rows))).tolist()
+    analyzer = SentimentAnalyzer()
+    analyzer.train_mock_model()
+
+    start = time.perf_counter()
+    separate_sentiment = analyzer.predict_batch(texts)
+    separate_clusters = TopicClusterer(n_clusters=3).cluster(texts)
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+    features = BatchFeatures.from_texts(texts)
+    extract = time.perf_counter() - start
+    shared_sentiment = analyzer.predict_batch(texts, features=features)
+    shared_clusters = TopicClusterer(n_clusters=3).cluster(texts, features=features)
+    shared = time.perf_counter() - start
+
+    matrix_mb = (features.counts.data.nbytes + features.counts.indices.nbytes + features.counts.indptr.nbytes) / 1e6
+    print(f"{rows} rows, {len(features.terms)} distinct terms, count matrix {matrix_mb:.1f}MB")
+    print(f"separate vectorizers: {separate:6.2f}s")
+    print(f"shared features:      {shared:6.2f}s (tokenization {extract:.2f}s), {separate / shared:.2f}x")
+    print(f"identical sentiment: {(separate_sentiment == shared_sentiment).mean():.2%}, "
+          f"identical clusters: {(separate_clusters == shared_clusters).mean():.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Memory-footprint report of pipeline results: the compact schema (src/schema.py)
+against the previous layout (uuid strings, formatted dates, one string per row for
+labels and processed text), for the same synthetic records. Bytes per row are
+deep sizes (every string counted), so they scale linearly to larger runs.
+
+Run from the project root:
+    python -m benchmarks.bench_memory [rows] [duplicate_share]
+
+duplicate_share is the fraction of posts that repeat an earlier one
+(retweets); it drives how much interning processed_text saves.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_records
+from src.preprocessor import Preprocessor
+from src.schema import intern_texts, categorical, cluster_ids, legacy, memory_report
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    duplicate_share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    rng = np.random.default_rng(0)
+
+    df = generate_records(rows)
+    # Retweets: copy the text of an earlier post
+    repeats = np.flatnonzero(rng.random(rows) < duplicate_share)
+    repeats = repeats[repeats > 0]
+    df.loc[repeats, "text"] = df["text"].to_numpy()[(rng.random(len(repeats)) * repeats).astype(np.int64)]
+
+    df["processed_text"] = intern_texts(Preprocessor().process_batch(df["text"]))
+    df["sentiment"] = categorical(rng.choice(["Positive", "Negative", "Neutral"], rows))
+    df["cluster"] = cluster_ids(rng.integers(0, 10, rows))
+
+    report = memory_report({"previous": legacy(df), "compact": df})
+    report["saved"] = 1 - report["compact"] / report["previous"]
+
+    print(f"{rows} rows, {duplicate_share:.0%} repeated posts, pandas {pd.__version__}")
+    print(f"{'column':16s} {'previous B/row':>15s} {'compact B/row':>14s} {'saved':>7s}")
+    for column, values in report.iterrows():
+        print(f"{column:16s} {values['previous']:15.1f} {values['compact']:14.1f} {values['saved']:7.0%}")
+    total = report.loc["total"]
+    print(f"at 10M rows: {total['previous'] * 1e7 / 1e9:.2f} GB -> {total['compact'] * 1e7 / 1e9:.2f} GB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Reports the speedup curve of Preprocessor.process_parallel against worker count.
+
+Run from the project root:
+    python -m benchmarks.bench_parallel [rows] [chunksize]
+"""
+import os
+import sys
+import time
+
+from benchmarks.common import load_corpus
+from src.preprocessor import Preprocessor
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    texts, source = load_corpus(limit)
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, cpu_count})
+    worker_counts = [w for w in worker_counts if w <= cpu_count]
+
+    print(f"Corpus: {source} ({len(texts)} tweets), chunksize={chunksize}, cores={cpu_count}")
+    expected = None
+    baseline = None
+    for workers in worker_counts:
+        # Fresh instance per run so no worker count benefits from a warmer cache
+        preprocessor = Preprocessor()
+        start = time.perf_counter()
+        result = preprocessor.process_parallel(texts, workers=workers, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+
+        if expected is None:
+            expected = result.tolist()
+            baseline = elapsed
+        elif result.tolist() != expected:
+            raise SystemExit(f"Output with {workers} workers differs from 1 worker!")
+
+        print(f"workers={workers:3d}  {len(texts) / elapsed:12,.0f} tweets/sec  speedup {baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Compares per-tweet Preprocessor.process with the vectorized process_batch.
+
+Run from the project root:
+    python -m benchmarks.bench_preprocessing [rows]
+"""
+import sys
+
+from benchmarks.common import load_corpus, timed
+from src.preprocessor import Preprocessor
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    texts, source = load_corpus(limit)
+    preprocessor = Preprocessor()
+
+    loop_time, expected = timed(lambda: [preprocessor.process(t) for t in texts])
+    batch_time, actual = timed(preprocessor.process_batch, texts)
+
+    if list(actual) != expected:
+        raise SystemExit("process_batch output differs from process!")
+
+    print(f"Corpus: {source} ({len(texts)} tweets)")
+    print(f"process (loop):  {len(texts) / loop_time:12,.0f} tweets/sec")
+    print(f"process_batch:   {len(texts) / batch_time:12,.0f} tweets/sec")
+    print(f"Speedup:         {loop_time / batch_time:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares results_output.csv with the partitioned Parquet ResultsStore:
+write time, full read, dashboard-column read and size on disk.
+
+Run from the project root:
+    python -m benchmarks.bench_results_store [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.data_collector import DataCollector
+from src.results_store import ResultsStore
+
+
+def synthetic_results(rows):
+    collector = DataCollector(seed=42)
+    templates = collector._get_fallback_mock_data(50)["text"].tolist()
+    texts = np.array(templates, dtype=object)[collector.rng.integers(0, len(templates), rows)]
+    df = collector._enrich(texts)
+    df["processed_text"] = df["text"].str.lower()
+    df["sentiment"] = collector.rng.choice(np.array(["Positive", "Negative", "Neutral"], dtype=object), rows)
+    df["cluster"] = collector.rng.integers(0, 3, rows)
+    return df
+
+
+def dir_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    import pandas as pd
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    df = synthetic_results(rows)
+    workdir = tempfile.mkdtemp()
+    csv_path = os.path.join(workdir, "results_output.csv")
+    store = ResultsStore(os.path.join(workdir, "results"))
+    columns = ["date", "user", "text", "sentiment", "cluster"]
+
+    csv_write, _ = timed(lambda: df.to_csv(csv_path, index=False))
+    csv_read, _ = timed(lambda: pd.read_csv(csv_path))
+    csv_cols, _ = timed(lambda: pd.read_csv(csv_path, usecols=columns))
+
+    pq_write, _ = timed(lambda: store.append(df))
+    pq_read, _ = timed(lambda: store.read())
+    pq_cols, loaded = timed(lambda: store.read(columns=columns))
+
+    print(f"{rows} rows, {len(store.days())} day partitions")
+    print(f"{'':10} {'write':>8} {'read all':>9} {'read dash':>10} {'size':>10}")
+    print(f"{'CSV':10} {csv_write:7.2f}s {csv_read:8.2f}s {csv_cols:9.2f}s {dir_size(csv_path) / 1e6:8.1f}MB")
+    print(f"{'Parquet':10} {pq_write:7.2f}s {pq_read:8.2f}s {pq_cols:9.2f}s {dir_size(store.root) / 1e6:8.1f}MB")
+    print(f"Parquet dtypes: {dict(loaded.dtypes.astype(str))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares the dashboard's old linear str.contains scan with the inverted index.
+
+Run from the project root:
+    python -m benchmarks.bench_search_index [rows] [query]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_results_store import synthetic_results
+from src.preprocessor import Preprocessor
+from src.results_store import ResultsStore
+from src.search_index import SearchIndex
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    query = sys.argv[2] if len(sys.argv) > 2 else "yapay zeka makale"
+    preprocessor = Preprocessor()
+
+    df = synthetic_results(rows)
+    df["processed_text"] = preprocessor.process_batch(df["text"]).tolist()
+    store = ResultsStore(os.path.join(tempfile.mkdtemp(), "results"))
+
+    start = time.perf_counter()
+    store.append(df)
+    write_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scan_hits = int(df["text"].str.contains(query.split()[0], case=False, na=False).sum())
+    scan_time = time.perf_counter() - start
+
+    index = SearchIndex(store)
+    terms = preprocessor.process(query).split()
+    start = time.perf_counter()
+    hits = index.search(terms)
+    search_time = time.perf_counter() - start
+    start = time.perf_counter()
+    page, total = index.read_page(hits, ["date", "user", "text", "sentiment", "cluster"])
+    page_time = time.perf_counter() - start
+
+    print(f"{rows} rows, write + index {write_time:.2f}s, query {query!r} -> terms {terms}")
+    print(f"str.contains (1 term): {scan_time * 1000:9.1f} ms  ({scan_hits} hits)")
+    print(f"index AND lookup:      {search_time * 1000:9.1f} ms  ({total} hits)")
+    print(f"first page fetch:      {page_time * 1000:9.1f} ms  ({len(page)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Near-duplicate collapse and "similar posts" queries on the LSH index, with
+recall against exact pairwise cosine on a subsample (the only size where the
+quadratic pass is still affordable).
+
+Run from the project root:
+    python -m benchmarks.bench_similarity [rows] [threshold]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from benchmarks.synthetic import generate_texts
+from src.clustering import TopicClusterer
+from src.features import BatchFeatures
+from src.preprocessor import Preprocessor
+from src.similarity import SimilarityIndex, near_duplicates
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.9
+    texts = Preprocessor().process_batch(pd.Series(generate_texts(rows))).tolist()
+    features = BatchFeatures.from_texts(texts)
+    vectors = TopicClusterer(n_clusters=3).fit_vectorizer(texts, features)
+
+    start = time.perf_counter()
+    representatives = near_duplicates(vectors, threshold=threshold)
+    dedup_time = time.perf_counter() - start
+    groups = len(np.unique(representatives))
+
+    start = time.perf_counter()
+    index = SimilarityIndex.build(vectors, [str(i) for i in range(rows)])
+    build_time = time.perf_counter() - start
+
+    queries = np.random.default_rng(0).integers(0, rows, 200)
+    start = time.perf_counter()
+    for row in queries:
+        index.similar(str(row), k=10)
+    query_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    sample = vectors[:min(rows, 5000)]
+    exact = sp.csr_matrix((sample @ sample.T) >= threshold)
+    exact_groups, _ = connected_components(exact, directed=False)
+    approx_groups = len(np.unique(near_duplicates(sample, threshold=threshold)))
+
+    print(f"{rows} rows, cosine >= {threshold}")
+    print(f"near-duplicate collapse: {dedup_time:6.2f}s ({rows / dedup_time:,.0f} rows/s), {groups} groups "
+          f"({rows / groups:.1f} posts per group)")
+    print(f"index build:             {build_time:6.2f}s, similar(k=10): {query_ms:.2f} ms/query")
+    print(f"{sample.shape[0]}-row sample: exact pairwise {exact_groups} groups, LSH {approx_groups} groups")
+
+
+if __name__ == "__main__":
+    main()
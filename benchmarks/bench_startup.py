@@ -0,0 +1,74 @@
+"""
+Cold-start budget: each command runs in a fresh interpreter (best of several
+runs) and fails the check when it is slower than its budget. Covers the CLI
+entry point, importing the preprocessing module and building a Preprocessor
+(what every spawned pool worker does). The slowest imports of each command
+come from python -X importtime.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--runs 5] [--scale 1.0]
+
+--scale multiplies every budget (e.g. 2 on a slow CI machine). Exits with
+status 1 when a budget is exceeded.
+"""
+import re
+import sys
+import time
+import argparse
+import subprocess
+
+
+# (name, command, budget in ms), measured against a bare "python -c pass"
+COMMANDS = [
+    ("python main.py --help", [sys.executable, "main.py", "--help"], 250),
+    ("import src.preprocessor", [sys.executable, "-c", "import src.preprocessor"], 800),
+    ("Preprocessor()", [sys.executable, "-c", "from src.preprocessor import Preprocessor; Preprocessor()"], 800),
+]
+
+
+def best_time(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def slowest_imports(command, count=3):
+    """
+    Top-level packages with the largest cumulative import time (ms).
+    """
+    result = subprocess.run(command[:1] + ["-X", "importtime"] + command[1:],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)", line)
+        # Only modules imported directly by the command, not their submodules
+        if match and not match.group(2):
+            name = match.group(3)
+            packages[name] = packages.get(name, 0) + int(match.group(1)) / 1000
+    return sorted(packages.items(), key=lambda item: -item[1])[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time / cold-start budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier applied to every budget")
+    args = parser.parse_args()
+
+    interpreter = best_time([sys.executable, "-c", "pass"], args.runs)
+    print(f"bare interpreter: {interpreter:.0f} ms (subtracted below)")
+    failed = False
+    for name, command, budget in COMMANDS:
+        elapsed = best_time(command, args.runs) - interpreter
+        budget *= args.scale
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        failed |= elapsed > budget
+        imports = ", ".join(f"{package} {ms:.0f}ms" for package, ms in slowest_imports(command))
+        print(f"{name:26s} {elapsed:7.0f} ms (budget {budget:.0f} ms) {status:12s} slowest: {imports}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
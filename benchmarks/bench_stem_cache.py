@@ -0,0 +1,53 @@
+"""
+Measures stemming throughput (tokens/sec) with the stem cache disabled, cold and warm.
+The warm run starts from a cache persisted to disk by the cold run.
+
+Run from the project root:
+    python -m benchmarks.bench_stem_cache [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import load_corpus
+from src.preprocessor import Preprocessor
+
+
+def stem_corpus(preprocessor, normalized):
+    start = time.perf_counter()
+    for text in normalized:
+        preprocessor.stem_text(text)
+    return time.perf_counter() - start
+
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    texts, source = load_corpus(limit)
+
+    base = Preprocessor(stem_cache_size=0)
+    normalized = [base.normalize_text(base.clean_text(t)) for t in texts]
+    n_tokens = sum(len(t.split()) for t in normalized)
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "stem_cache.json")
+
+    no_cache_time = stem_corpus(base, normalized)
+
+    cold = Preprocessor(stem_cache_path=cache_path)
+    cold_time = stem_corpus(cold, normalized)
+    cold_stats = cold.stem_cache.stats()
+    cold.save_stem_cache()
+
+    warm = Preprocessor(stem_cache_path=cache_path)
+    warm_time = stem_corpus(warm, normalized)
+    warm_stats = warm.stem_cache.stats()
+
+    print(f"Corpus: {source} ({len(texts)} tweets, {n_tokens} tokens)")
+    print(f"No cache:    {n_tokens / no_cache_time:12,.0f} tokens/sec")
+    print(f"Cold cache:  {n_tokens / cold_time:12,.0f} tokens/sec  (hit rate {cold_stats['hit_rate']:.1%})")
+    print(f"Warm cache:  {n_tokens / warm_time:12,.0f} tokens/sec  (hit rate {warm_stats['hit_rate']:.1%})")
+    print(f"Cache size:  {warm_stats['size']} entries")
+
+
+if __name__ == "__main__":
+    main()
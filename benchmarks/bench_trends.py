@@ -0,0 +1,62 @@
+"""
+Keeps burst scores current while batches arrive: the incremental TrendEngine
+against recomputing hourly counts and EWMA scores from the full history after
+every batch. Dates are spread over 30 days and arrive out of order, like the
+collector's records.
+
+Run from the project root:
+    python -m benchmarks.bench_trends [rows] [batch_size]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.results_store import build_trend_counts
+from src.trends import TrendEngine
+
+
+def generate_events(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2026-01-01") + pd.to_timedelta(rng.integers(0, 30 * 86400, rows), unit="s")
+    return pd.DataFrame({
+        "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "cluster": rng.integers(0, 8, rows),
+        "sentiment": rng.choice(["Positive", "Negative", "Neutral"], rows)
+    })
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    events = generate_events(rows)
+    batches = [events.iloc[start:start + batch_size] for start in range(0, rows, batch_size)]
+
+    engine = TrendEngine("hour", window=24)
+    incremental = []
+    for batch in batches:
+        start = time.perf_counter()
+        engine.update(batch)
+        bursts = engine.bursts("cluster")
+        incremental.append(time.perf_counter() - start)
+
+    recompute = []
+    for number in range(1, len(batches) + 1):
+        start = time.perf_counter()
+        history = pd.concat(batches[:number])
+        recomputed = TrendEngine.from_counts(build_trend_counts(history), "hour", window=24).history("cluster")
+        recompute.append(time.perf_counter() - start)
+
+    latest = recomputed[recomputed["start"] == recomputed["start"].max()].set_index("cluster")["burst"]
+    assert np.allclose(bursts.set_index("cluster")["burst"].sort_index(), latest.sort_index())
+
+    print(f"{rows} events in {len(batches)} batches of {batch_size}, hourly buckets")
+    print(f"incremental: first batch {incremental[0] * 1000:7.1f} ms, last batch {incremental[-1] * 1000:7.1f} ms, "
+          f"{rows / sum(incremental):,.0f} events/s")
+    print(f"recompute:   first batch {recompute[0] * 1000:7.1f} ms, last batch {recompute[-1] * 1000:7.1f} ms, "
+          f"total {sum(recompute):.2f}s vs {sum(incremental):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Stemming throughput (tokens/sec, stem cache disabled) and vocabulary size for the
+English Snowball stemmer, the Turkish suffix stemmer and the mixed per-token router
+that Preprocessor uses by default. Vocabulary is counted as distinct stems and as
+CountVectorizer features, the feature space the sentiment and topic models see.
+
+Uses TurkishTweets.csv (data/tweets.csv) when present, otherwise the synthetic
+Turkish/English corpus. The Turkish stemmer is first checked against known stems
+(EXPECTED_STEMS); the run stops on a mismatch.
+
+Run from the project root:
+    python -m benchmarks.bench_turkish_stemmer [rows]
+"""
+import os
+import sys
+import time
+
+from sklearn.feature_extraction.text import CountVectorizer
+
+from benchmarks.common import load_corpus
+from benchmarks.synthetic import generate_texts
+from src.data_collector import DataCollector
+from src.preprocessor import Preprocessor, STEMMERS
+from src.turkish_stemmer import TurkishStemmer
+
+# Words that share a stem must get the same one, and words that do not must not
+EXPECTED_STEMS = {
+    "araba": "araba", "arabalar": "araba", "arabayı": "araba", "arabayla": "araba",
+    "dolar": "dolar", "sıradan": "sıra", "okudum": "oku",
+    "gelecek": "gel", "geleceği": "gel", "geleceğim": "gel", "geldiğimiz": "gel",
+    "kitabı": "kitap", "kitaplar": "kitap", "kitaplarımı": "kitap",
+    "ödevlerimi": "ödev", "gözlerini": "göz", "masaya": "masa",
+    "kedi": "kedi", "kediler": "kedi", "kedisi": "kedi", "kediyi": "kedi",
+    "kadın": "kadın", "kadınlar": "kadın", "ordu": "ordu", "dede": "dede", "kapı": "kapı",
+    "seçim": "seçim", "seçimler": "seçim", "türkiye": "türkiye", "türkiyede": "türkiye",
+    "öğrenci": "öğrenci", "öğrenciler": "öğrenci", "başkanı": "başkan", "başkanlar": "başkan",
+    "gelecekte": "gel", "annem": "anne", "anneler": "anne",
+}
+
+
+def check_stems():
+    stemmer = TurkishStemmer()
+    wrong = {word: stemmer.stem(word) for word, stem in EXPECTED_STEMS.items() if stemmer.stem(word) != stem}
+    assert not wrong, f"unexpected stems: {wrong}"
+
+
+def load_texts(rows):
+    if os.path.exists(DataCollector().csv_path):
+        return load_corpus(rows)
+    return list(generate_texts(rows or 50000)), "synthetic corpus"
+
+
+def stem_all(stemmer, tokens):
+    start = time.perf_counter()
+    stems = [stemmer.stem(token) for token in tokens]
+    return time.perf_counter() - start, stems
+
+
+def feature_count(texts):
+    return len(CountVectorizer().fit(texts).vocabulary_)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    check_stems()
+    texts, source = load_texts(rows)
+
+    base = Preprocessor(stem_cache_size=0)
+    normalized = [base.normalize_text(base.clean_text(text)) for text in texts]
+    tokens = [token for text in normalized for token in text.split()]
+    unique = sorted(set(tokens))
+
+    print(f"Corpus: {source} ({len(texts)} tweets, {len(tokens)} tokens, {len(unique)} distinct)")
+    print(f"{'stemmer':10s} {'tokens/sec':>12s} {'stems':>8s} {'reduction':>10s} {'features':>9s}")
+    print(f"{'none':10s} {'':>12s} {len(unique):8d} {'':>10s} {feature_count(normalized):9d}")
+    for name in ("english", "turkish", "mixed"):
+        stemmer = STEMMERS[name]()
+        # Warm-up call so the lazy Snowball import is not timed
+        stemmer.stem("warmup")
+        elapsed, stems = stem_all(stemmer, tokens)
+        mapping = dict(zip(tokens, stems))
+        stemmed_texts = [" ".join(mapping[token] for token in text.split()) for text in normalized]
+        n_stems = len(set(mapping.values()))
+        print(f"{name:10s} {len(tokens) / elapsed:12,.0f} {n_stems:8d} {1 - n_stems / len(unique):10.1%} "
+              f"{feature_count(stemmed_texts):9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import os
+import time
+import pandas as pd
+
+from src.data_collector import DataCollector
+
+
+def load_corpus(limit=None):
+    """
+    Loads tweet texts from the local TurkishTweets.csv copy (data/tweets.csv).
+    Falls back to the DataCollector mock templates when the dataset is missing.
+    """
+    collector = DataCollector()
+    if os.path.exists(collector.csv_path):
+        texts = pd.read_csv(collector.csv_path)['Tweet'].dropna().astype(str)
+        if limit is not None:
+            texts = texts.head(limit)
+        return texts.reset_index(drop=True), "TurkishTweets.csv"
+
+    records = collector._get_fallback_mock_data(limit or 5000)
+    return records["text"], "mock templates"
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """
+    Runs func several times and returns (best elapsed seconds, last result).
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
@@ -0,0 +1,95 @@
+"""
+Load test for the sentiment inference server on localhost.
+
+Start the server first:
+    python -m src.inference_server --port 8765
+then run from the project root:
+    python -m benchmarks.load_test --port 8765 --concurrency 64 --requests 20000
+
+With --spawn the server is started in-process on a free port instead.
+"""
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+from benchmarks.common import load_corpus
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+async def client(host, port, texts, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for text in texts:
+            start = time.perf_counter()
+            await request(reader, writer, "POST", "/predict", {"text": text})
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def run(args):
+    server = None
+    if args.spawn:
+        from src.inference_server import InferenceServer, load_analyzer
+        from src.preprocessor import Preprocessor
+        preprocessor = Preprocessor()
+        server = InferenceServer(load_analyzer(preprocessor), preprocessor, args.host, 0,
+                                 args.max_batch_size, args.max_wait_ms)
+        await server.start()
+        args.port = server.port
+
+    texts, source = load_corpus(args.requests)
+    texts = texts.tolist()
+    while len(texts) < args.requests:
+        texts.extend(texts[:args.requests - len(texts)])
+    shards = [texts[i::args.concurrency] for i in range(args.concurrency)]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args.host, args.port, shard, latencies) for shard in shards))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    metrics = await request(reader, writer, "GET", "/metrics")
+    writer.close()
+    if server is not None:
+        await server.stop()
+
+    p50, p99 = np.percentile(np.array(latencies) * 1000, [50, 99])
+    print(f"Corpus: {source}, {len(latencies)} requests, concurrency {args.concurrency}")
+    print(f"Client: {len(latencies) / elapsed:10,.0f} req/sec  p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+    print(f"Server: {metrics['throughput_rps']:10,.0f} req/sec  p50 {metrics['latency_p50_ms']:.2f} ms  "
+          f"p99 {metrics['latency_p99_ms']:.2f} ms  avg batch {metrics['avg_batch_size']:.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--spawn", action="store_true", help="Start the server in-process")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
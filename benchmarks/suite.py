@@ -0,0 +1,213 @@
+"""
+End-to-end benchmark suite over synthetic corpora (fully offline).
+
+For each corpus size the pipeline stages are timed on the same data:
+preprocessing (per-row process and vectorized process_batch), sentiment
+predict_batch, clustering, keyword extraction, CSV write and the dashboard
+load. Throughput and peak memory are written as JSON so two runs can be
+compared and regressions flagged.
+
+Run from the project root:
+    python -m benchmarks.suite run --sizes 10k,100k --output bench-base.json
+    python -m benchmarks.suite run --sizes 10k,100k --output bench-new.json
+    python -m benchmarks.suite compare bench-base.json bench-new.json --threshold 0.10
+
+Each size runs in a fresh process so its peak RSS is not inherited from the
+previous (smaller or larger) size.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from src.instrumentation import peak_rss_mb
+
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+
+def parse_size(value):
+    if value in SIZES:
+        return SIZES[value]
+    value = value.lower()
+    for suffix, factor in (("k", 1_000), ("m", 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def stage(results, name, rows, func):
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    results[name] = {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": rss_after,
+        # ru_maxrss only grows, so this is how far the stage pushed the peak
+        "peak_rss_growth_mb": (rss_after - rss_before) if rss_after is not None else None
+    }
+    return result
+
+
+def run_size(rows, seed, loop_rows):
+    """
+    Runs every stage on a rows-sized corpus; executed in a child process.
+    """
+    import pandas as pd
+
+    from benchmarks.synthetic import generate_records
+    from src.clustering import TopicClusterer
+    from src.preprocessor import Preprocessor
+    from src.results_store import build_rollup
+    from src.sentiment_analyzer import SentimentAnalyzer
+
+    results = {}
+    df = stage(results, "synthetic.generate", rows, lambda: generate_records(rows, seed))
+
+    preprocessor = Preprocessor()
+    loop_texts = df["text"].head(loop_rows)
+    stage(results, "preprocess.process", len(loop_texts),
+          lambda: [preprocessor.process(text) for text in loop_texts])
+    df["processed_text"] = stage(results, "preprocess.process_batch", rows,
+                                 lambda: preprocessor.process_batch(df["text"]))
+
+    analyzer = SentimentAnalyzer()
+    analyzer.train_mock_model()
+    df["sentiment"] = stage(results, "sentiment.predict_batch", rows,
+                            lambda: analyzer.predict_batch(df["processed_text"].tolist()))
+
+    clusterer = TopicClusterer(n_clusters=3)
+    df["cluster"] = stage(results, "clusterer.cluster", rows,
+                          lambda: clusterer.cluster(df["processed_text"].tolist()))
+    stage(results, "clusterer.get_cluster_keywords", 0, lambda: clusterer.get_cluster_keywords())
+
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    try:
+        csv_path = os.path.join(workdir, "results_output.csv")
+        stage(results, "output.csv_write", rows, lambda: df.to_csv(csv_path, index=False))
+        # What the dashboard does on a cold start without a results store
+        stage(results, "dashboard.load", rows, lambda: build_rollup(pd.read_csv(csv_path)))
+        size_mb = os.path.getsize(csv_path) / 1e6
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"rows": rows, "csv_mb": size_mb, "peak_rss_mb": peak_rss_mb(), "stages": results}
+
+
+def environment():
+    import numpy
+    import pandas
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "sklearn": sklearn.__version__
+    }
+
+
+def run(args):
+    report = {"environment": environment(), "seed": args.seed, "sizes": {}}
+    context = multiprocessing.get_context("spawn")
+    for label in args.sizes.split(","):
+        rows = parse_size(label)
+        print(f"[{label}] {rows} rows ...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_size, rows, args.seed, min(rows, args.loop_rows)).result()
+        report["sizes"][label] = result
+        for name, stats in result["stages"].items():
+            print(f"  {name:32} {stats['seconds']:8.2f}s {stats['rows_per_sec']:12,.0f} rows/s "
+                  f"{stats['peak_rss_mb'] or 0:8.0f}MB")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+def compare(args):
+    """
+    Flags stages whose throughput dropped, or whose peak memory grew, by more
+    than threshold (relative). Returns the number of regressions.
+    """
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    regressions = 0
+    print(f"{'size':6} {'stage':32} {'base rows/s':>12} {'new rows/s':>12} {'change':>8} {'base MB':>8} {'new MB':>8}")
+    for label, new_size in new["sizes"].items():
+        base_size = base["sizes"].get(label)
+        if base_size is None:
+            continue
+        for name, new_stats in new_size["stages"].items():
+            base_stats = base_size["stages"].get(name)
+            if base_stats is None or not new_stats["seconds"]:
+                continue
+            # Relative throughput; stages without a row count compare wall time
+            change = base_stats["seconds"] / new_stats["seconds"] - 1
+            flags = []
+            if change < -args.threshold:
+                flags.append("SLOWER")
+            base_mb, new_mb = base_stats["peak_rss_mb"], new_stats["peak_rss_mb"]
+            if base_mb and new_mb and new_mb > base_mb * (1 + args.threshold):
+                flags.append("MEMORY")
+            regressions += bool(flags)
+            print(f"{label:6} {name:32} {base_stats['rows_per_sec']:12,.0f} {new_stats['rows_per_sec']:12,.0f} "
+                  f"{change:+7.1%} {base_mb or 0:8.0f} {new_mb or 0:8.0f} {' '.join(flags)}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic-corpus benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmark every stage at the given corpus sizes")
+    run_parser.add_argument("--sizes", default="10k,100k", help="Comma-separated sizes, e.g. 10k,100k,1M,10M")
+    run_parser.add_argument("--output", default="benchmark_results.json", help="JSON report path")
+    run_parser.add_argument("--seed", type=int, default=42, help="Corpus generator seed")
+    run_parser.add_argument("--loop-rows", type=int, default=100_000,
+                            help="Row cap for the per-row Preprocessor.process loop")
+
+    compare_parser = commands.add_parser("compare", help="Compare two reports and flag regressions")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Relative slowdown / memory growth counted as a regression")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(1 if compare(args) else 0)
+
+
+if __name__ == "__main__":
+    main()
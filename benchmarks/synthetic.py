@@ -0,0 +1,79 @@
+"""
+Offline synthetic Turkish/English tweet corpora of any size.
+
+Texts start from the DataCollector mock templates (for a range of topics) and get
+extra words drawn from a Zipf-distributed vocabulary, plus occasional mentions,
+hashtags, URLs and numbers, so every preprocessing branch is exercised and the
+vocabulary keeps growing with the corpus like real data.
+"""
+import numpy as np
+import pandas as pd
+
+from src.data_collector import DataCollector
+
+
+TOPICS = [
+    "Yapay Zeka", "Ekonomi", "Futbol", "Seçim", "Deprem", "Enflasyon",
+    "Machine Learning", "Climate Change", "Football", "Elections", "Crypto", "Startups"
+]
+
+# Turkish roots x suffixes and English words give a few thousand surface forms
+TR_ROOTS = [
+    "ev", "iş", "okul", "para", "maç", "takım", "hava", "şehir", "yol", "haber", "fiyat", "kira",
+    "öğrenci", "hükümet", "piyasa", "dolar", "altın", "teknoloji", "telefon", "bilgisayar", "oyun",
+    "film", "dizi", "müzik", "kitap", "yemek", "çay", "kahve", "tatil", "deniz", "araba", "trafik",
+    "sağlık", "doktor", "hastane", "aşı", "enerji", "elektrik", "su", "gıda", "market", "maaş"
+]
+TR_SUFFIXES = [
+    "", "ler", "lar", "de", "da", "den", "dan", "e", "a", "i", "ı", "in", "ın", "imiz", "ımız",
+    "lerde", "larda", "leri", "ları", "siz", "sız", "li", "lı", "cilik", "cı", "ci"
+]
+EN_WORDS = [
+    "great", "terrible", "amazing", "awful", "love", "hate", "news", "market", "price", "game",
+    "team", "player", "win", "lose", "vote", "policy", "storm", "rain", "energy", "data", "model",
+    "training", "launch", "release", "update", "bug", "feature", "startup", "funding", "investors",
+    "crash", "rally", "stock", "bitcoin", "token", "goal", "match", "coach", "referee", "fans"
+]
+
+
+def vocabulary():
+    words = [root + suffix for root in TR_ROOTS for suffix in TR_SUFFIXES]
+    words += EN_WORDS + [word + "s" for word in EN_WORDS] + [word + "ing" for word in EN_WORDS]
+    return np.array(sorted(set(words)), dtype=object)
+
+
+def generate_texts(rows, seed=42):
+    """
+    Returns a numpy object array of rows synthetic tweet texts.
+    """
+    rng = np.random.default_rng(seed)
+    collector = DataCollector()
+    templates = np.array([t for topic in TOPICS for t in collector._mock_templates(topic)], dtype=object)
+    words = vocabulary()
+
+    texts = templates[rng.integers(0, len(templates), rows)]
+    n_extra = rng.integers(0, 7, rows)
+    # Zipf ranks over the shuffled vocabulary: a few very common words, a long tail
+    ranks = np.minimum(rng.zipf(1.3, n_extra.sum()) - 1, len(words) - 1)
+    extra = words[rng.permutation(len(words))][ranks]
+
+    splits = np.cumsum(n_extra)[:-1]
+    extras = [" ".join(chunk) for chunk in np.split(extra, splits)]
+    texts = pd.Series(texts, dtype=object) + " " + pd.Series(extras, dtype=object)
+
+    # Decorations that the cleaning step must remove
+    decorate = rng.random(rows)
+    mentions = pd.Series(rng.integers(0, 5000, rows)).astype(str)
+    texts = texts.where(decorate >= 0.15, texts + " @user" + mentions)
+    texts = texts.where((decorate < 0.15) | (decorate >= 0.25), texts + " #gundem" + mentions)
+    texts = texts.where((decorate < 0.25) | (decorate >= 0.30), texts + " https://t.co/x" + mentions)
+    texts = texts.where((decorate < 0.30) | (decorate >= 0.40), texts + " " + mentions + "!!")
+    return texts.str.strip().to_numpy(dtype=object)
+
+
+def generate_records(rows, seed=42):
+    """
+    Full pipeline records (id, text, user, date, platform) for rows synthetic tweets.
+    """
+    collector = DataCollector(seed=seed)
+    return collector._enrich(generate_texts(rows, seed), platform="Twitter (Synthetic)")
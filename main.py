@@ -1,20 +1,344 @@
+import os
+import math
 import time
+import uuid
+import cProfile
+import argparse
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 
-from src.data_collector import DataCollector
-from src.preprocessor import Preprocessor
-from src.sentiment_analyzer import SentimentAnalyzer
-from src.clustering import TopicClusterer
+# Pipeline modules pull in pandas, sklearn, scipy and pyarrow (seconds of imports);
+# they are imported inside the functions that run the pipeline, so argument
+# errors and --help return immediately
+from src.instrumentation import metrics
 
 console = Console()
 
-def main():
-    console.clear()
+def cluster_count(value):
+    return value if value == "auto" else int(value)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Social Media Data Mining Project")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Preprocessing worker processes (0 = all cores, 1 = in-process)")
+    parser.add_argument("--chunksize", type=int, default=5000,
+                        help="Tweets per chunk handed to each preprocessing worker")
+    parser.add_argument("--stream", action="store_true",
+                        help="Process the dataset batch by batch in bounded memory")
+    parser.add_argument("--count", type=int, default=100,
+                        help="Tweets to sample (0 = whole dataset, with --stream or --shards only)")
+    parser.add_argument("--batch-size", type=int, default=10000,
+                        help="Rows per batch in streaming mode")
+    parser.add_argument("--overlap", action="store_true",
+                        help="Run streaming stages on separate threads to overlap I/O and compute")
+    parser.add_argument("--output-format", choices=["parquet", "csv", "both"], default="parquet",
+                        help="Write results to the partitioned Parquet store (results/), results_output.csv, or both")
+    parser.add_argument("--append", action="store_true",
+                        help="Add this run to the Parquet store instead of replacing its contents")
+    parser.add_argument("--no-theatrics", "--batch", dest="no_theatrics", action="store_true",
+                        help="Headless mode: no artificial pauses, per-row progress or dashboard prompt")
+    parser.add_argument("--profile", nargs="?", const="profile", default=None, metavar="PREFIX",
+                        help="Write a cProfile dump (PREFIX.prof) and per-stage metrics (PREFIX.json)")
+    parser.add_argument("--clusters", type=cluster_count, default="auto", metavar="K",
+                        help="Number of topic clusters, or 'auto' to choose k (2-10) by silhouette/Davies-Bouldin "
+                             "on a stratified sample")
+    parser.add_argument("--dedup", nargs="?", type=float, const=0.9, default=None, metavar="THRESHOLD",
+                        help="Collapse near-duplicate posts (cosine >= THRESHOLD, default 0.9) before "
+                             "sentiment and clustering (batch mode only)")
+    # Keys of src.trends.FREQUENCIES
+    parser.add_argument("--trend-freq", choices=["day", "hour"], default="hour",
+                        help="Bucket width of the trend windows")
+    parser.add_argument("--trend-window", type=int, default=24, metavar="BUCKETS",
+                        help="Sliding trend window length in buckets")
+    parser.add_argument("--shards", type=int, default=0, metavar="N",
+                        help="Split the batch run into N hash-of-id shards processed by worker processes "
+                             "that coordinate through --shared-dir")
+    parser.add_argument("--shared-dir", default=None, metavar="DIR",
+                        help="Directory shared by the coordinator and shard workers (default: data/shards)")
+    parser.add_argument("--local-workers", type=int, default=None, metavar="M",
+                        help="Shards 0..M-1 run as local processes (default: all); the rest are expected "
+                             "from `main.py --worker SHARD` on other nodes")
+    parser.add_argument("--worker", type=int, default=None, metavar="SHARD",
+                        help="Run as the worker of one shard of the job posted in --shared-dir, then exit")
+    args = parser.parse_args()
+    if args.dedup is not None and args.stream:
+        parser.error("--dedup is only supported in batch mode")
+    if args.shards and (args.stream or args.dedup is not None):
+        parser.error("--shards cannot be combined with --stream or --dedup")
+    if args.count < 0:
+        parser.error("--count cannot be negative")
+    if args.count == 0 and not (args.stream or args.shards or args.worker is not None):
+        parser.error("--count must be at least 1 in batch mode (0 = whole dataset needs --stream or --shards)")
+    return args
+
+def pause(args, seconds):
+    # Presentation-only delays; skipped in headless runs
+    if not args.no_theatrics:
+        time.sleep(seconds)
+
+def print_stage_report():
+    report = metrics.report()
+    stage_table = Table(title="Stage Metrics")
+    stage_table.add_column("Stage", style="cyan", no_wrap=True)
+    stage_table.add_column("Calls", justify="right")
+    stage_table.add_column("Seconds", justify="right")
+    stage_table.add_column("Rows", justify="right")
+    stage_table.add_column("Rows/sec", justify="right")
+    stage_table.add_column("MB read", justify="right")
+    # ru_maxrss only grows: this is the process peak so far, not the stage's own
+    stage_table.add_column("Process peak RSS MB", justify="right")
+    for stage in report["stages"]:
+        stage_table.add_row(
+            stage["stage"], str(stage["calls"]), f"{stage['seconds']:.3f}", str(stage["rows"]),
+            f"{stage['rows_per_sec']:,.0f}", f"{stage['bytes_read'] / 1e6:.1f}",
+            f"{stage['process_peak_rss_mb']:.0f}" if stage["process_peak_rss_mb"] is not None else "-"
+        )
+    console.print(stage_table)
+
+def open_results_store(args):
+    if args.output_format == "csv":
+        return None
+    from src.results_store import ResultsStore
+    store = ResultsStore("results")
+    if not args.append:
+        store.clear()
+    return store
+
+def describe_outputs(args):
+    outputs = []
+    if args.output_format in ("parquet", "both"):
+        outputs.append("results/ (Parquet)")
+    if args.output_format in ("csv", "both"):
+        outputs.append("results_output.csv")
+    return " and ".join(outputs)
+
+def print_cluster_table(keywords, counts):
+    cluster_table = Table(title="Discovered Topics & Clusters")
+    cluster_table.add_column("Cluster ID", justify="center")
+    cluster_table.add_column("Top Keywords", style="cyan")
+    cluster_table.add_column("Count", justify="right")
+    
+    for cluster_id in sorted(keywords):
+        keys = ", ".join(keywords.get(cluster_id, []))
+        cluster_table.add_row(str(cluster_id), keys, str(counts.get(cluster_id, 0)))
+        
+    console.print(cluster_table)
+
+def print_k_scores(clusterer):
+    k_table = Table(title=f"Cluster Count Search (selected k={clusterer.n_clusters})")
+    k_table.add_column("k", justify="center")
+    k_table.add_column("Silhouette", justify="right")
+    k_table.add_column("Davies-Bouldin", justify="right")
+    k_table.add_column("Fit (s)", justify="right")
+    for score in clusterer.k_scores:
+        style = "bold green" if score["k"] == clusterer.n_clusters else None
+        k_table.add_row(str(score["k"]), f"{score['silhouette']:.3f}", f"{score['davies_bouldin']:.3f}",
+                        f"{score['seconds']:.2f}", style=style)
+    console.print(k_table)
+
+def collapse_near_duplicates(df, clusterer, features, threshold):
+    """
+    Groups near-duplicate posts on the clusterer's TF-IDF vectors (LSH, no pairwise pass).
+    Adds duplicate_of (representative id) and multiplicity (group size) to df and returns
+    (representative rows, each row's position among them).
+    """
+    import numpy as np
+    from src.similarity import near_duplicates
+
+    vectors = clusterer.fit_vectorizer(df['processed_text'], features)
+    representatives = near_duplicates(vectors, threshold=threshold)
+    unique_rows = np.unique(representatives)
+    group = np.searchsorted(unique_rows, representatives)
+    df['duplicate_of'] = df['id'].to_numpy()[representatives]
+    df['multiplicity'] = np.bincount(group)[group].astype('int32')
+    return unique_rows, group
+
+def print_trends(trends):
+    if not len(trends):
+        return
+    latest = trends.start_of(trends.latest)
+    trend_table = Table(title=f"Topic Bursts ({trends.freq} of {latest:%Y-%m-%d %H:%M}, "
+                              f"last {trends.window} {trends.freq}s)")
+    trend_table.add_column("Cluster ID", justify="center")
+    trend_table.add_column("Posts", justify="right")
+    trend_table.add_column("Window", justify="right")
+    trend_table.add_column("EWMA", justify="right")
+    trend_table.add_column("Burst", justify="right")
+    for row in trends.bursts("cluster").itertuples():
+        style = "bold red" if row.burst >= 3 else None
+        trend_table.add_row(str(row.cluster), str(row.count), str(row.window_count),
+                            "-" if math.isnan(row.ewma) else f"{row.ewma:.1f}", f"{row.burst:+.2f}", style=style)
+    console.print(trend_table)
+
+def print_sentiment_panel(sentiment_counts):
+    console.print(Panel(f"Positive: {sentiment_counts.get('Positive', 0)}\nNegative: {sentiment_counts.get('Negative', 0)}\nNeutral: {sentiment_counts.get('Neutral', 0)}", title="Sentiment Distribution", border_style="green"))
+
+def train_sentiment_model(analyzer, collector, preprocessor):
+    # Prefer the labeled TurkishTweets.csv corpus; the toy model is only a fallback
+    if os.path.exists(collector.csv_path):
+        try:
+            analyzer.train_from_corpus(collector.csv_path, preprocessor=preprocessor)
+            return
+        except Exception as e:
+            console.print(f"[red]Corpus training failed ({e}), using mock model.[/red]")
+    analyzer.train_mock_model()
+
+def run_streaming(args):
+    """
+    Streaming mode: every batch flows through all stages and is appended to
+    the results output as soon as it is done.
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.data_collector import DataCollector
+    from src.preprocessor import Preprocessor
+    from src.sentiment_analyzer import SentimentAnalyzer
+    from src.clustering import TopicClusterer
+    from src.pipeline import StreamingPipeline
+    from src.model_store import ModelStore
+    from src.trends import TrendEngine
+
+    collector = DataCollector(topic="Yapay Zeka")
+    preprocessor = Preprocessor(stem_cache_path=os.path.join(collector.data_dir, "stem_cache.json"))
+    analyzer = SentimentAnalyzer(model_store=ModelStore(os.path.join(collector.data_dir, "models")))
+    # Online clustering keeps topics current across batches without refitting
+    clusterer = TopicClusterer(n_clusters=args.clusters, online=True)
+
+    with console.status("[bold green]Training Naive Bayes Model on historical data...[/bold green]"):
+        train_sentiment_model(analyzer, collector, preprocessor)
+
+    pipeline = StreamingPipeline(
+        collector, preprocessor, analyzer, clusterer,
+        output_path="results_output.csv" if args.output_format != "parquet" else None,
+        results_store=open_results_store(args), overlap=args.overlap, workers=args.workers,
+        chunksize=args.chunksize, trends=TrendEngine(args.trend_freq, args.trend_window)
+    )
+
+    console.print(f"\n[bold green]Streaming pipeline[/bold green] (batch size {args.batch_size}, overlap {'on' if args.overlap else 'off'})")
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}")) as progress:
+        task = progress.add_task("[cyan]Collect > Preprocess > Sentiment > Cluster > Write", total=None)
+        try:
+            for batch in pipeline.run(batch_size=args.batch_size, sample=args.count or None):
+                progress.update(task, description=f"[cyan]Processed {pipeline.rows} tweets...")
+        finally:
+            pipeline.close()
+
+    preprocessor.save_stem_cache()
+    console.print(f"Processed [bold]{pipeline.rows}[/bold] items.")
+    print_sentiment_panel(pipeline.sentiment_counts)
+    if clusterer.k_scores:
+        print_k_scores(clusterer)
+    print_cluster_table(clusterer.get_cluster_keywords(), pipeline.cluster_counts)
+    print_trends(pipeline.trends)
+    console.print(f"Saved to [bold]{describe_outputs(args)}[/bold]")
+
+def run_sharded(args):
+    """
+    Batch mode split across hash-of-id shards: worker processes (local, or started on
+    other nodes with --worker) preprocess, score sentiment and run the k-means steps
+    of their shard; this process merges their partial statistics and writes the same
+    outputs as run_batch, in input order one batch at a time.
+    """
+    import scipy.sparse as sp
+    import numpy as np
+    from src.data_collector import DataCollector
+    from src.preprocessor import Preprocessor
+    from src.sentiment_analyzer import SentimentAnalyzer
+    from src.similarity import SimilarityIndex
+    from src.model_store import ModelStore
+    from src.trends import TrendEngine
+    from src.distributed import Coordinator
+
+    collector = DataCollector(topic="Yapay Zeka")
+    shared_dir = args.shared_dir or os.path.join(collector.data_dir, "shards")
+    preprocessor = Preprocessor(stem_cache_path=os.path.join(collector.data_dir, "stem_cache.json"))
+    analyzer = SentimentAnalyzer(model_store=ModelStore(os.path.join(collector.data_dir, "models")))
+    with console.status("[bold green]Training Naive Bayes Model on historical data...[/bold green]"):
+        train_sentiment_model(analyzer, collector, preprocessor)
+
+    coordinator = Coordinator(shared_dir, args.shards, n_clusters=args.clusters)
+    try:
+        with console.status(f"[cyan]Splitting records into {args.shards} shards...[/cyan]"):
+            coordinator.submit(collector.iter_batches(args.batch_size, sample=args.count or None), analyzer, preprocessor)
+        local = args.shards if args.local_workers is None else min(args.local_workers, args.shards)
+        coordinator.start_local_workers(range(local))
+        console.print(f"\n[bold green]Sharded batch run[/bold green] ({coordinator.rows} items, {args.shards} shards, "
+                      f"{local} local workers, job {coordinator.job.id} in {shared_dir})")
+        if local < args.shards:
+            console.print(f"Waiting for shards {local}..{args.shards - 1}: "
+                          f"[bold]python main.py --worker SHARD --shared-dir {shared_dir}[/bold]")
+
+        with console.status("[bold blue]Preprocessing, sentiment and K-Means rounds on the shards...[/bold blue]"):
+            clusterer = coordinator.fit_clusters()
+        print_sentiment_panel(coordinator.sentiment_counts)
+        if clusterer.k_scores:
+            print_k_scores(clusterer)
+        console.print(f"K-Means converged after {coordinator.rounds} merge rounds.")
+
+        store = open_results_store(args)
+        run_id = uuid.uuid4().hex[:12]
+        trends = TrendEngine(args.trend_freq, args.trend_window)
+        vectors, ids = [], []
+        for number, (df, batch_vectors) in enumerate(coordinator.iter_results(args.batch_size)):
+            if store is not None:
+                store.append(df, run_id=f"{run_id}-{number:05d}")
+                vectors.append(batch_vectors)
+                ids.append(df['id'].to_numpy())
+            if args.output_format in ("csv", "both"):
+                df.to_csv("results_output.csv", mode='w' if number == 0 else 'a', header=number == 0, index=False)
+            trends.update(df)
+        if store is not None:
+            store.save_similarity_index(SimilarityIndex.build(sp.vstack(vectors), np.concatenate(ids)), run_id)
+        coordinator.finish()
+    except BaseException:
+        coordinator.fail()
+        raise
+
+    print_cluster_table(clusterer.get_cluster_keywords(), coordinator.cluster_counts)
+    print_trends(trends)
+    console.print(f"Saved to [bold]{describe_outputs(args)}[/bold]")
+
+def main(args):
+    if not args.no_theatrics:
+        console.clear()
     console.print(Panel.fit("[bold cyan]Social Media Data Mining Project[/bold cyan]\n[yellow]Analysis of Trends & Sentiments[/yellow]", border_style="blue"))
-    time.sleep(1)
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    start = time.perf_counter()
+
+    if args.stream:
+        run_streaming(args)
+    elif args.shards:
+        run_sharded(args)
+    else:
+        pause(args, 1)
+        run_batch(args)
+
+    wall_time = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(f"{args.profile}.prof")
+        metrics.write_json(f"{args.profile}.json", wall_seconds=wall_time)
+        print_stage_report()
+        console.print(f"Profile written to [bold]{args.profile}.prof[/bold] and [bold]{args.profile}.json[/bold] (wall time {wall_time:.2f}s)")
+
+    if not args.no_theatrics:
+        launch_dashboard()
+
+def run_batch(args):
+    import numpy as np
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from src.data_collector import DataCollector
+    from src.preprocessor import Preprocessor
+    from src.sentiment_analyzer import SentimentAnalyzer
+    from src.clustering import TopicClusterer
+    from src.features import BatchFeatures
+    from src.similarity import SimilarityIndex
+    from src.model_store import ModelStore
+    from src.trends import TrendEngine
+    from src.schema import intern_texts, categorical, cluster_ids
 
     # 1. Data Collection
     console.print("\n[bold green]1. Data Collection Phase[/bold green]")
@@ -26,10 +350,10 @@ def main():
         transient=True,
     ) as progress:
         task = progress.add_task(description="Connecting to (Mock) Social Media API...", total=10)
-        time.sleep(1)
+        pause(args, 1)
         progress.update(task, description="Fetching Tweets...", advance=5)
-        time.sleep(1)
-        df = collector.generate_data(count=100) # Generating 100 rows
+        pause(args, 1)
+        df = collector.generate_data(count=args.count) # Generating 100 rows by default
         progress.update(task, completed=10)
 
     console.print(f"Successfully collected [bold]{len(df)}[/bold] items.")
@@ -43,69 +367,97 @@ def main():
     for _, row in df.head(5).iterrows():
         table.add_row(str(row['date'])[:10], row['user'], row['text'][:50] + "...")
     console.print(table)
-    time.sleep(1)
+    pause(args, 1)
 
     # 2. Preprocessing
     console.print("\n[bold green]2. Preprocessing Phase[/bold green]")
-    preprocessor = Preprocessor()
+    preprocessor = Preprocessor(stem_cache_path=os.path.join(collector.data_dir, "stem_cache.json"))
     
-    processed_texts = []
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Cleaning, Normalizing, Stemming...", total=len(df))
-        for text in df['text']:
-            processed = preprocessor.process(text)
-            processed_texts.append(processed)
-            progress.update(task, advance=1)
-            time.sleep(0.01) # Simulate work
-    
-    df['processed_text'] = processed_texts
+    if args.workers != 1:
+        workers = args.workers or os.cpu_count()
+        with console.status(f"[cyan]Cleaning, Normalizing, Stemming on {workers} workers...[/cyan]"):
+            processed = preprocessor.process_parallel(df['text'], workers=workers, chunksize=args.chunksize)
+        df['processed_text'] = intern_texts(processed)
+    elif args.no_theatrics:
+        # One vectorized call, no per-chunk progress updates
+        df['processed_text'] = intern_texts(preprocessor.process_batch(df['text']))
+    else:
+        processed_chunks = []
+        chunk_size = 25
+        with Progress() as progress:
+            task = progress.add_task("[cyan]Cleaning, Normalizing, Stemming...", total=len(df))
+            for start in range(0, len(df), chunk_size):
+                chunk = df['text'].iloc[start:start + chunk_size]
+                processed_chunks.extend(preprocessor.process_batch(chunk))
+                progress.update(task, advance=len(chunk))
+                pause(args, 0.01 * len(chunk)) # Simulate work
+        
+        df['processed_text'] = intern_texts(processed_chunks)
+    preprocessor.save_stem_cache()
     console.print("Preprocessing complete.")
     console.print(f"[italic]Example transformation:[/italic]\n[red]Original:[/red] {df['text'].iloc[0]}\n[green]Processed:[/green] {df['processed_text'].iloc[0]}")
-    time.sleep(1)
+    pause(args, 1)
 
     # 3. Sentiment Analysis
     console.print("\n[bold green]3. Sentiment Analysis Phase (Classification)[/bold green]")
-    analyzer = SentimentAnalyzer()
+    # Fitted models are reused across runs when data and parameters match
+    model_store = ModelStore(os.path.join(collector.data_dir, "models"))
+    analyzer = SentimentAnalyzer(model_store=model_store)
     
     with console.status("[bold green]Training Naive Bayes Model on historical data...[/bold green]"):
-        analyzer.train_mock_model()
-        time.sleep(1.5)
+        train_sentiment_model(analyzer, collector, preprocessor)
+        pause(args, 1.5)
     
-    sentiments = analyzer.predict_batch(df['processed_text'])
-    df['sentiment'] = sentiments
+    # Tokenized once; the classifier and the clusterer both read these counts
+    features = BatchFeatures.from_texts(df['processed_text'])
+    clusterer = TopicClusterer(n_clusters=args.clusters, model_store=model_store)
+
+    # Sentiment and clustering run on one representative per near-duplicate group;
+    # results are copied back to every member
+    texts, work_features, group = df['processed_text'], features, np.arange(len(df))
+    if args.dedup is not None:
+        unique_rows, group = collapse_near_duplicates(df, clusterer, features, args.dedup)
+        texts, work_features = texts.iloc[unique_rows], features.take(unique_rows)
+        console.print(f"Collapsed {len(df)} posts into {len(unique_rows)} near-duplicate groups "
+                      f"(cosine >= {args.dedup}).")
+
+    sentiments = analyzer.predict_batch(texts, features=work_features)
+    df['sentiment'] = categorical(sentiments[group])
     
     # Stats
-    sentiment_counts = df['sentiment'].value_counts()
-    console.print(Panel(f"Positive: {sentiment_counts.get('Positive', 0)}\nNegative: {sentiment_counts.get('Negative', 0)}\nNeutral: {sentiment_counts.get('Neutral', 0)}", title="Sentiment Distribution", border_style="green"))
+    print_sentiment_panel(df['sentiment'].value_counts())
 
     # 4. Clustering
     console.print("\n[bold green]4. Topic Clustering Phase (Unsupervised)[/bold green]")
-    clusterer = TopicClusterer(n_clusters=3)
-    
     with console.status("[bold blue]Running K-Means Clustering...[/bold blue]"):
-        labels = clusterer.cluster(df['processed_text'])
-        time.sleep(1)
+        # auto_k samples evenly across sentiments so minority topics are represented
+        labels = clusterer.cluster(texts, features=work_features, strata=sentiments)
+        pause(args, 1)
+    if clusterer.k_scores:
+        print_k_scores(clusterer)
     
-    df['cluster'] = labels
+    df['cluster'] = cluster_ids(labels[group])
     keywords = clusterer.get_cluster_keywords()
     
-    cluster_table = Table(title="Discovered Topics & Clusters")
-    cluster_table.add_column("Cluster ID", justify="center")
-    cluster_table.add_column("Top Keywords", style="cyan")
-    cluster_table.add_column("Count", justify="right")
-    
-    for cluster_id in range(3):
-        count = len(df[df['cluster'] == cluster_id])
-        keys = ", ".join(keywords.get(cluster_id, []))
-        cluster_table.add_row(str(cluster_id), keys, str(count))
-        
-    console.print(cluster_table)
+    print_cluster_table(keywords, df['cluster'].value_counts().to_dict())
+    print_trends(TrendEngine(args.trend_freq, args.trend_window).update(df))
 
     # Final Output
     console.print("\n[bold yellow]Analysis Complete! Saving results...[/bold yellow]")
-    df.to_csv("results_output.csv", index=False)
-    console.print("Saved to [bold]results_output.csv[/bold]")
+    store = open_results_store(args)
+    if store is not None:
+        run_id = uuid.uuid4().hex[:12]
+        store.append(df, run_id=run_id)
+        # "Similar posts" index over every row, in the vector space the clusters were found in
+        vectors = clusterer.transform(df['processed_text'], features)
+        store.save_similarity_index(SimilarityIndex.build(vectors, df['id']), run_id)
+    if args.output_format in ("csv", "both"):
+        start = time.perf_counter()
+        df.to_csv("results_output.csv", index=False)
+        metrics.record("results.to_csv", time.perf_counter() - start, len(df))
+    console.print(f"Saved to [bold]{describe_outputs(args)}[/bold]")
 
+def launch_dashboard():
     # Visualization Prompt (Streamlit)
     from rich.prompt import Confirm
     import subprocess
@@ -122,8 +474,19 @@ def main():
         except Exception as e:
             console.print(f"[bold red]Error launching dashboard:[/bold red] {e}")
 
+def run_worker(args):
+    from src.distributed import run_worker
+    shared_dir = args.shared_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "shards")
+    console.print(f"Worker for shard [bold]{args.worker}[/bold] waiting for a job in {shared_dir}")
+    run_worker(shared_dir, args.worker)
+    console.print(f"Shard {args.worker} done.")
+
 if __name__ == "__main__":
     try:
-        main()
+        args = parse_args()
+        if args.worker is not None:
+            run_worker(args)
+        else:
+            main(args)
     except KeyboardInterrupt:
         console.print("\n[bold red]Process interrupted by user.[/bold red]")
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import hashlib
+import shutil
+import zipfile
+
+import requests
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from src.instrumentation import metrics
+
+# Download/copy buffer: few syscalls, modest memory
+CHUNK_SIZE = 1 << 20
+# Network reads stay small: bytes of a read cut off by a dropped connection are lost
+READ_SIZE = 1 << 16
+# pandas.read_csv's default NA strings: the Arrow cache has to drop the same tweets
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+# Bumped whenever csv_to_arrow changes what it writes, so older caches are rebuilt
+ARROW_CACHE_VERSION = 2
+
+def sha256_file(path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Manifest:
+    """
+    Checksums of acquired files (data/manifest.json): name -> {sha256, size, mtime_ns, ...}.
+    A file is only trusted if it matches its entry, so a truncated or half-written
+    file is re-acquired instead of silently read.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def record(self, path, **extra):
+        stat = os.stat(path)
+        entry = {"sha256": sha256_file(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        entry.update(extra)
+        self.entries[os.path.basename(path)] = entry
+        self._save()
+        return entry
+
+    def forget(self, path):
+        if self.entries.pop(os.path.basename(path), None) is not None:
+            self._save()
+
+    def get(self, path):
+        return self.entries.get(os.path.basename(path))
+
+    def verify(self, path, full=False):
+        """
+        True when path matches its entry. Size and mtime must match; the sha256 is
+        recomputed when full=True or when the mtime changed (e.g. the file was copied).
+        """
+        entry = self.get(path)
+        if entry is None or not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != entry["size"]:
+            return False
+        if full or stat.st_mtime_ns != entry["mtime_ns"]:
+            return sha256_file(path) == entry["sha256"]
+        return True
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(temp_path, self.path)
+
+def _range_total(response):
+    # "Content-Range: bytes */12345" on a 416 response
+    value = response.headers.get("Content-Range", "")
+    total = value.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def download(url, path, sha256=None, retries=5, backoff=1.0, chunk_size=CHUNK_SIZE,
+             timeout=30, session=None, on_progress=None):
+    """
+    Downloads url to path through path.part, resuming with HTTP Range requests after
+    interruptions (up to retries attempts, exponential backoff). Only failures after
+    the server answered are retried; a first connection that cannot be made raises at
+    once. The finished file is
+    checked against the expected length (and sha256, if given) and only then renamed
+    into place, so path never holds a partial download.
+    on_progress(done_bytes, total_bytes) is called as data arrives.
+    """
+    session = session or requests.Session()
+    part_path = f"{path}.part"
+    attempt = 0
+    start = time.perf_counter()
+    received = 0
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        connected = False
+        try:
+            with session.get(url, stream=True, headers=headers, timeout=timeout) as response:
+                connected = True
+                if response.status_code == 416:
+                    # Nothing left to fetch, unless the remote file is not the one we started
+                    total = _range_total(response)
+                    if total is not None and total != offset:
+                        os.remove(part_path)
+                        raise requests.exceptions.ChunkedEncodingError("Partial download does not match the remote file")
+                else:
+                    response.raise_for_status()
+                    if offset and response.status_code != 206:
+                        # Server ignored the range: start over
+                        offset = 0
+                    total = response.headers.get("Content-Length")
+                    total = int(total) + offset if total is not None else None
+                    with open(part_path, "ab" if offset else "wb", buffering=chunk_size) as f:
+                        done = offset
+                        for block in response.iter_content(chunk_size=READ_SIZE):
+                            f.write(block)
+                            done += len(block)
+                            received += len(block)
+                            if on_progress is not None:
+                                on_progress(done, total)
+                size = os.path.getsize(part_path)
+                if total is not None and size != total:
+                    raise requests.exceptions.ChunkedEncodingError(f"Incomplete download: {size} of {total} bytes")
+            break
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError) as e:
+            # No connection and nothing received yet (DNS failure, refused, connect
+            # timeout, e.g. offline): waiting will not help, fail right away
+            if not connected and not received:
+                raise
+            attempt += 1
+            if attempt > retries:
+                raise
+            wait = backoff * 2 ** (attempt - 1)
+            print(f"Download interrupted ({e}); resuming in {wait:.1f}s (attempt {attempt}/{retries})")
+            time.sleep(wait)
+
+    if sha256 is not None and sha256_file(part_path) != sha256:
+        os.remove(part_path)
+        raise ValueError(f"Checksum mismatch for {url}")
+    os.replace(part_path, path)
+    metrics.record("collector.download", time.perf_counter() - start, bytes_read=received)
+    return path
+
+def find_member(zip_path, suffix):
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in archive.namelist():
+            if name.endswith(suffix):
+                return name
+    return None
+
+def extract_member(zip_path, member, path, chunk_size=CHUNK_SIZE):
+    """
+    Streams one zip member straight to path (through path.part, renamed when complete).
+    The zip CRC is checked as the member is read, so a corrupt archive raises here.
+    """
+    part_path = f"{path}.part"
+    with zipfile.ZipFile(zip_path) as archive, archive.open(member) as source, open(part_path, "wb") as target:
+        shutil.copyfileobj(source, target, chunk_size)
+    os.replace(part_path, path)
+    return path
+
+def csv_to_arrow(open_source, arrow_path, block_size=CHUNK_SIZE * 16):
+    """
+    Converts a CSV once into an uncompressed Arrow IPC (Feather v2) file, batch by batch,
+    every column as a string, with the NA_VALUES strings stored as nulls the way
+    pandas reads them. open_source() returns a fresh binary stream of the CSV
+    (a file or a zip member; it is opened twice: header, then data).
+    Later runs memory-map the result instead of parsing the CSV again.
+    """
+    read_options = pacsv.ReadOptions(block_size=block_size)
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    with open_source() as source:
+        names = pacsv.open_csv(source, read_options=read_options, parse_options=parse_options).schema.names
+    schema = pa.schema([pa.field(name, pa.string()) for name in names])
+
+    part_path = f"{arrow_path}.part"
+    rows = 0
+    with open_source() as source:
+        reader = pacsv.open_csv(
+            source, read_options=read_options, parse_options=parse_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types=schema, null_values=NA_VALUES, strings_can_be_null=True
+            )
+        )
+        with pa.OSFile(part_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    os.replace(part_path, arrow_path)
+    return rows
+
+def read_arrow(arrow_path, columns=None):
+    """
+    Memory-maps an Arrow IPC file: no parsing and no copy until values are used.
+    """
+    table = pa.ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+    return table.select(columns) if columns else table
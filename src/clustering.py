@@ -1,36 +1,373 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from threadpoolctl import threadpool_limits
+
+from src.features import BatchFeatures
+from src.model_store import ModelStore
+from src.instrumentation import instrumented
+
+def top_k_indices(scores, k):
+    """
+    Column indices of the k largest values in each row, best first.
+    Uses argpartition so only the k winners per row are sorted.
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    rows = np.arange(scores.shape[0])[:, None]
+    order = np.argsort(-scores[rows, top], axis=1, kind='stable')
+    return top[rows, order]
+
+def stratified_sample(n_rows, size, strata=None, seed=42):
+    """
+    Sorted row indices of a size-row sample. With strata (one label per row), every
+    stratum keeps its share of the rows, so small groups are not lost from the sample.
+    """
+    rng = np.random.default_rng(seed)
+    if size >= n_rows:
+        return np.arange(n_rows)
+    if strata is None:
+        return np.sort(rng.choice(n_rows, size, replace=False))
+
+    labels, codes = np.unique(np.asarray(strata), return_inverse=True)
+    rows = []
+    for code in range(len(labels)):
+        members = np.flatnonzero(codes == code)
+        take = max(1, int(round(size * len(members) / n_rows)))
+        rows.append(rng.choice(members, min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(rows))
+
+# Davies-Bouldin needs dense rows; it is computed on a projection of the sample
+DB_COMPONENTS = 100
+# Below these sizes every k is scored in-process: a pool costs more than it saves
+INLINE_SAMPLE_ROWS = 2000
+INLINE_K_VALUES = 2
+
+def _init_k_worker():
+    # One BLAS/OpenMP thread per process; the parallelism comes from the pool
+    threadpool_limits(limits=1)
+
+def _project(sample, seed):
+    """
+    Dense low-rank projection (truncated SVD) of the sparse sample, for Davies-Bouldin.
+    """
+    from sklearn.decomposition import TruncatedSVD
+    components = min(DB_COMPONENTS, sample.shape[1] - 1, sample.shape[0] - 1)
+    if components < 1:
+        return sample.toarray()
+    return TruncatedSVD(n_components=components, random_state=seed).fit_transform(sample)
+
+def _score_k(sample, projection, k, seed):
+    """
+    Fits KMeans with k clusters on the sparse sample and scores the partition:
+    silhouette on the sample itself, Davies-Bouldin on its dense projection.
+    """
+    start = time.perf_counter()
+    model = KMeans(n_clusters=k, random_state=seed, n_init='auto').fit(sample)
+    if len(np.unique(model.labels_)) < 2:
+        silhouette, davies_bouldin = -1.0, float("inf")
+    else:
+        # Silhouette is quadratic in the rows it scores, so it uses a subset of the sample
+        silhouette = float(silhouette_score(sample, model.labels_, sample_size=min(sample.shape[0], 2000),
+                                            random_state=seed))
+        davies_bouldin = float(davies_bouldin_score(projection, model.labels_))
+    return {
+        "k": k,
+        "silhouette": silhouette,
+        "davies_bouldin": davies_bouldin,
+        "seconds": time.perf_counter() - start,
+        "centers": model.cluster_centers_
+    }
+
+@instrumented("clusterer.select_k")
+def select_k(matrix, k_values, sample_size=5000, strata=None, workers=None, seed=42):
+    """
+    Evaluates every k on a stratified sample, one KMeans fit per k across a process pool
+    (in-process for small samples or ranges). The sample stays sparse.
+    The winner has the best mean rank of silhouette (higher is better) and
+    Davies-Bouldin (lower is better). Returns (k, its sample centroids in the full
+    feature space, per-k scores); no scores when the sample is too small to rank k.
+    """
+    rows = stratified_sample(matrix.shape[0], sample_size, strata, seed)
+    sample = matrix[rows]
+    # Only the columns the sample uses are kept (hashed spaces have 2**18 columns)
+    columns = np.unique(sample.indices)
+    sample = sample[:, columns].astype(np.float32)
+    candidates = [k for k in k_values if 2 <= k < len(rows)]
+    if not candidates:
+        if not len(rows):
+            raise ValueError("No rows to choose a cluster count")
+        # Too few rows to score any k (silhouette needs k < rows): the smallest
+        # candidate the rows allow, fitted without scores
+        k = max(min(min(k_values), len(rows)), 1)
+        centers = np.zeros((k, matrix.shape[1]))
+        centers[:, columns] = KMeans(n_clusters=k, random_state=seed, n_init='auto').fit(sample).cluster_centers_
+        return k, centers, []
+    k_values = candidates
+    projection = _project(sample, seed)
+
+    workers = min(workers or os.cpu_count(), len(k_values))
+    if workers > 1 and len(rows) > INLINE_SAMPLE_ROWS and len(k_values) > INLINE_K_VALUES:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_k_worker) as executor:
+            scores = list(executor.map(_score_k, [sample] * len(k_values), [projection] * len(k_values),
+                                       k_values, [seed] * len(k_values)))
+    else:
+        scores = [_score_k(sample, projection, k, seed) for k in k_values]
+
+    silhouette_rank = np.argsort(np.argsort([-score["silhouette"] for score in scores], kind="stable"), kind="stable")
+    davies_bouldin_rank = np.argsort(np.argsort([score["davies_bouldin"] for score in scores], kind="stable"), kind="stable")
+    best = scores[int(np.argmin(silhouette_rank + davies_bouldin_rank))]
+
+    centers = np.zeros((best["k"], matrix.shape[1]))
+    centers[:, columns] = best["centers"]
+    return best["k"], centers, [{key: value for key, value in score.items() if key != "centers"} for score in scores]
 
 class TopicClusterer:
-    def __init__(self, n_clusters=3):
-        self.n_clusters = n_clusters
-        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.model = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    def __init__(self, n_clusters=3, online=False, n_features=2**18, model_store=None,
+                 k_range=(2, 10), sample_size=5000, workers=None):
+        # n_clusters="auto" picks k from k_range (inclusive) on a sample at every cluster() fit
+        # (online: on the first batch)
+        self.auto_k = n_clusters == "auto"
+        self.n_clusters = None if self.auto_k else n_clusters
+        self.k_range = k_range
+        self.sample_size = sample_size
+        self.workers = workers
+        self.k_scores = None
+        self.online = online
+        # Optional ModelStore; batch fits on identical data are loaded instead of refitted
+        self.model_store = model_store
+        if online:
+            # Stateless hashing keeps the feature space fixed across batches.
+            # Input is Preprocessor output, which has no stop words left to filter.
+            self.vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+            self.model = None if self.auto_k else MiniBatchKMeans(n_clusters=n_clusters, random_state=42, n_init=3)
+            # Hash bucket -> first term seen in it, used to name centroid features
+            self.bucket_terms = {}
+            self.seen_terms = set()
+        else:
+            # TF-IDF = vocabulary counts (replaced by the fitted vocabulary in cluster()) + IDF weighting,
+            # so the counts can come from a BatchFeatures shared with the sentiment model
+            self.vectorizer = CountVectorizer(max_features=1000)
+            self.tfidf = TfidfTransformer()
+            self.model = None if self.auto_k else KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+
+        # Mean document vector, for distinctive keyword scoring
+        self.global_mean = None
+        self.n_seen = 0
+        # Feature-name array (and, online, the named-bucket mask) reused across calls
+        self._terms = None
+        self._named = None
+        self._terms_key = None
+
+    @classmethod
+    def from_statistics(cls, vocabulary, idf):
+        """
+        Batch-mode clusterer over a vocabulary and IDF weights merged from shard
+        statistics (src/distributed.py) instead of fitted on one corpus. transform()
+        works right away; with_centers() adds the centroids.
+        """
+        clusterer = cls(n_clusters=None)
+        clusterer.vectorizer = CountVectorizer(vocabulary=list(vocabulary),
+                                               max_features=clusterer.vectorizer.max_features).fit([])
+        clusterer.tfidf.idf_ = np.asarray(idf, dtype=np.float64)
+        return clusterer
+
+    def with_centers(self, centers, global_mean=None, n_seen=0, k_scores=None):
+        """
+        Sets centroids computed elsewhere. Fitting K-Means on the centroids themselves
+        leaves them unchanged and gives a model whose predict() works.
+        """
+        centers = np.asarray(centers, dtype=np.float64)
+        self.n_clusters = len(centers)
+        self.model = KMeans(n_clusters=len(centers), init=centers, n_init=1, max_iter=1).fit(centers)
+        self.global_mean = global_mean
+        self.n_seen = n_seen
+        self.k_scores = k_scores
+        return self
 
-    def cluster(self, texts):
+    @instrumented("clusterer.cluster", rows=lambda args, result: len(result))
+    def cluster(self, texts, features=None, strata=None):
         """
         Applies TF-IDF vectorization and K-Means clustering.
         Returns the cluster labels and the transformed matrix.
+        In online mode the batch updates the centroids incrementally instead.
+        features: optional BatchFeatures of texts, reused instead of tokenizing again.
+        strata: optional per-text labels (e.g. sentiment) to stratify the auto_k sample.
         """
-        tfidf_matrix = self.vectorizer.fit_transform(texts)
+        if self.online:
+            self.partial_fit(texts, features)
+            return self.predict(texts, features)
+
+        key = None
+        if self.model_store is not None:
+            texts = list(texts)
+            params = (self.vectorizer, self.tfidf, self.model, self.auto_k and (self.k_range, self.sample_size))
+            key = ModelStore.make_key(texts, params)
+            if self.model_store.exists("clusterer", key):
+                (self.vectorizer, self.tfidf, self.model,
+                 self.global_mean, self.n_seen, self.k_scores) = self.model_store.load("clusterer", key)
+                self.n_clusters = self.model.n_clusters
+                self._terms = None
+                return self.model.labels_
+
+        tfidf_matrix = self.fit_vectorizer(texts, features)
+        if self.auto_k:
+            self._select_model(tfidf_matrix, strata)
         self.model.fit(tfidf_matrix)
+        self.global_mean = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
+        self.n_seen = tfidf_matrix.shape[0]
+        self._terms = None
+
+        if key is not None:
+            self.model_store.save("clusterer", key,
+                                  (self.vectorizer, self.tfidf, self.model, self.global_mean, self.n_seen,
+                                   self.k_scores),
+                                  params=params)
         
         return self.model.labels_
 
-    def get_cluster_keywords(self, n_terms=5):
+    def _select_model(self, matrix, strata=None):
+        """
+        auto_k: picks k on a sample, then warm-starts the full fit from the sample centroids.
+        """
+        low, high = self.k_range
+        k, centers, self.k_scores = select_k(matrix, range(low, high + 1), self.sample_size, strata, self.workers)
+        self.n_clusters = k
+        if self.online:
+            self.model = MiniBatchKMeans(n_clusters=k, init=centers, n_init=1, random_state=42)
+        else:
+            self.model = KMeans(n_clusters=k, init=centers, n_init=1, random_state=42)
+
+    def fit_vectorizer(self, texts, features=None):
+        """
+        Fits the TF-IDF vocabulary (top terms) and IDF weights on texts (batch mode only)
+        and returns their TF-IDF matrix. cluster() calls this before K-Means.
+        """
+        if self.online:
+            raise Exception("fit_vectorizer requires TopicClusterer(online=False)")
+        if features is None:
+            features = BatchFeatures.from_texts(texts)
+        vocabulary, counts = features.select(self.vectorizer.max_features)
+        self.vectorizer = CountVectorizer(vocabulary=vocabulary, max_features=self.vectorizer.max_features).fit([])
+        self._terms = None
+        return self.tfidf.fit_transform(counts)
+
+    @instrumented("clusterer.partial_fit", rows=lambda args, result: len(args[1]))
+    def partial_fit(self, texts, features=None):
+        """
+        Updates the centroids with one batch (online mode only).
+        Cost per call depends on the batch size, not on the data seen so far.
+        """
+        if not self.online:
+            raise Exception("partial_fit requires TopicClusterer(online=True)")
+
+        self._record_terms(texts, features)
+        matrix = self.transform(texts, features)
+        if self.model is None:
+            # auto_k: k is chosen on the first batch
+            self._select_model(matrix)
+        self.model.partial_fit(matrix)
+
+        # Running mean over every document seen so far
+        batch_sum = np.asarray(matrix.sum(axis=0)).ravel()
+        if self.global_mean is None:
+            self.global_mean = batch_sum / matrix.shape[0]
+        else:
+            total = self.n_seen + matrix.shape[0]
+            self.global_mean = (self.global_mean * self.n_seen + batch_sum) / total
+        self.n_seen += matrix.shape[0]
+        return self
+
+    def _record_terms(self, texts, features=None):
+        if features is not None:
+            batch_terms = set(features.terms)
+        else:
+            analyzer = self.vectorizer.build_analyzer()
+            batch_terms = {term for text in texts for term in analyzer(text)}
+        new_terms = sorted(batch_terms - self.seen_terms)
+        if not new_terms:
+            return
+        self.seen_terms.update(new_terms)
+
+        # Each single-term document hashes to exactly one bucket
+        buckets = self.vectorizer.transform(new_terms).tocsr()
+        for row, term in enumerate(new_terms):
+            for index in buckets.indices[buckets.indptr[row]:buckets.indptr[row + 1]]:
+                self.bucket_terms.setdefault(int(index), term)
+
+    @instrumented("clusterer.predict", rows=lambda args, result: len(result))
+    def predict(self, texts, features=None):
+        """
+        Assigns texts to the clusters found by the last cluster() call without refitting.
+        """
+        return self.model.predict(self.transform(texts, features))
+
+    def transform(self, texts, features=None):
+        """
+        Vectors the clusters are computed on: TF-IDF in batch mode, hashed counts online.
+        """
+        matrix = features.project(self.vectorizer) if features is not None else self.vectorizer.transform(texts)
+        return matrix if self.online else self.tfidf.transform(matrix)
+
+    def _feature_names(self):
+        """
+        Returns the feature-name array and a mask of named features, rebuilt only
+        when the vocabulary changes. Online, hashed buckets without a recorded term are unnamed.
+        """
+        if self.online:
+            key = len(self.bucket_terms)
+            if self._terms is None or self._terms_key != key:
+                terms = np.empty(self.vectorizer.n_features, dtype=object)
+                buckets = np.fromiter(self.bucket_terms.keys(), dtype=np.intp, count=key)
+                terms[buckets] = list(self.bucket_terms.values())
+                self._terms = terms
+                self._named = np.zeros(self.vectorizer.n_features, dtype=bool)
+                self._named[buckets] = True
+                self._terms_key = key
+        elif self._terms is None:
+            self._terms = self.vectorizer.get_feature_names_out()
+            self._named = None
+        return self._terms, self._named
+
+    @instrumented("clusterer.get_cluster_keywords")
+    def get_cluster_keywords(self, n_terms=5, with_weights=False, distinctive=False):
         """
         Returns the top keywords for each cluster centroind.
+        With distinctive=True terms are ranked by centroid weight minus the global mean,
+        favouring words that set a cluster apart over words common to all of them.
+        With with_weights=True each keyword comes as a (term, score) pair.
         """
         if not hasattr(self.model, 'cluster_centers_'):
             return {}
 
-        order_centroids = self.model.cluster_centers_.argsort()[:, ::-1]
-        terms = self.vectorizer.get_feature_names_out()
+        terms, named = self._feature_names()
+        scores = self.model.cluster_centers_
+        if distinctive and self.global_mean is not None:
+            scores = scores - self.global_mean
+        if named is not None:
+            scores = np.where(named, scores, -np.inf)
+
+        top = top_k_indices(scores, n_terms)
+        top_scores = np.take_along_axis(scores, top, axis=1)
         
         cluster_keywords = {}
-        for i in range(self.n_clusters):
-            top_terms = [terms[ind] for ind in order_centroids[i, :n_terms]]
-            cluster_keywords[i] = top_terms
+        for i in range(scores.shape[0]):
+            keep = np.isfinite(top_scores[i])
+            if self.online:
+                # Zero-weight buckets carry no information about the cluster
+                keep &= top_scores[i] > 0
+            indices, weights = top[i, keep], top_scores[i, keep]
+            if with_weights:
+                cluster_keywords[i] = [(terms[ind], float(w)) for ind, w in zip(indices, weights)]
+            else:
+                cluster_keywords[i] = [terms[ind] for ind in indices]
             
         return cluster_keywords
 
@@ -47,3 +384,10 @@ if __name__ == "__main__":
     labels = clusterer.cluster(sample_texts)
     print("Labels:", labels)
     print("Keywords:", clusterer.get_cluster_keywords())
+    print("Distinctive:", clusterer.get_cluster_keywords(n_terms=3, with_weights=True, distinctive=True))
+
+    online = TopicClusterer(n_clusters=3, online=True)
+    online.partial_fit(sample_texts[:3])
+    online.partial_fit(sample_texts[3:])
+    print("Online labels:", online.predict(sample_texts))
+    print("Online keywords:", online.get_cluster_keywords())
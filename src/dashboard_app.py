@@ -2,6 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
+import sys
+
+# "streamlit run src/dashboard_app.py" puts src/ on the path, not the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.results_store import ResultsStore, build_rollup, build_trend_counts
+from src.trends import TrendEngine, FREQUENCIES
+from src.search_index import SearchIndex
+from src.preprocessor import Preprocessor
 
 # Set page config
 st.set_page_config(
@@ -11,62 +20,171 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+RAW_COLUMNS = ["date", "user", "text", "sentiment", "cluster", "id"]
+PAGE_SIZE = 100
+
 @st.cache_data
-def load_data():
+def load_csv():
+    # Legacy CSV export; only used when there is no results store
     if os.path.exists("results_output.csv"):
         return pd.read_csv("results_output.csv")
     return None
 
+@st.cache_data
+def load_rollup():
+    """
+    Pre-aggregated counts (day x cluster x sentiment x user). Charts and KPIs are
+    computed from this table, so reruns cost O(groups) instead of O(rows).
+    """
+    store = ResultsStore("results")
+    if store.exists():
+        rollup = store.read_rollup()
+    else:
+        df = load_csv()
+        if df is None:
+            return None
+        rollup = build_rollup(df)
+    # Plotly's hierarchy charts cannot aggregate unordered categoricals
+    return rollup.astype({"day": str, "user": str, "sentiment": str})
+
+@st.cache_data
+def load_trend_counts():
+    # Hourly cluster x sentiment counts; every trend view is derived from these
+    store = ResultsStore("results")
+    if store.exists():
+        return store.read_trend_counts()
+    df = load_csv()
+    return build_trend_counts(df) if df is not None else None
+
+@st.cache_data
+def load_trends(freq, window, level, sliding, sentiments, clusters):
+    """
+    Time series, burst history and current bursts of one trend view, from a
+    TrendEngine fed with the (filtered) pre-aggregated counts.
+    """
+    counts = load_trend_counts()
+    counts = counts[counts["sentiment"].isin(sentiments) & counts["cluster"].isin(clusters)]
+    engine = TrendEngine.from_counts(counts, freq=freq, window=window)
+    return engine.counts(level, sliding=sliding), engine.history(level), engine.bursts(level)
+
+@st.cache_resource
+def load_search_index(segment_names):
+    """
+    Inverted index kept in the dashboard process; reloaded only when new segments appear.
+    """
+    return SearchIndex(ResultsStore("results"))
+
+@st.cache_resource
+def load_preprocessor():
+    # Queries are tokenized and stemmed exactly like the indexed processed_text
+    return Preprocessor()
+
+def index_segments():
+    index_root = os.path.join("results", "_index")
+    return tuple(sorted(os.listdir(index_root))) if os.path.isdir(index_root) else ()
+
+@st.cache_resource
+def load_similarity_indexes(run_names):
+    """
+    Memory-mapped nearest-neighbour indexes; reloaded only when a batch run adds one.
+    """
+    return ResultsStore("results").similarity_indexes()
+
+def similarity_runs():
+    similar_root = os.path.join("results", "_similar")
+    return tuple(sorted(os.listdir(similar_root))) if os.path.isdir(similar_root) else ()
+
+@st.cache_data
+def load_similar(tweet_id, k):
+    """
+    The k posts most similar to tweet_id (LSH candidates re-ranked by cosine), with their rows.
+    """
+    for index in load_similarity_indexes(similarity_runs()):
+        if index.row_of(tweet_id) is None:
+            continue
+        matches = pd.DataFrame(index.similar(tweet_id, k), columns=["id", "similarity"])
+        if matches.empty:
+            break
+        rows = ResultsStore("results").read_ids(matches["id"], columns=RAW_COLUMNS)
+        return matches.merge(rows, on="id")[["similarity"] + RAW_COLUMNS]
+    return pd.DataFrame(columns=["similarity"] + RAW_COLUMNS)
+
+@st.cache_data
+def load_page(sentiments, clusters, search_term, page):
+    """
+    One page of raw rows for the data explorer, read lazily with the filters pushed down.
+    Searches are answered from the inverted index (all query terms must match); a
+    search with no indexable terms falls back to a substring scan of the store.
+    """
+    store = ResultsStore("results")
+    segments = index_segments()
+    if store.exists() and search_term and segments:
+        index = load_search_index(segments)
+        hits = index.search(load_preprocessor().process(search_term).split())
+        if hits is not None:
+            return index.read_page(hits, RAW_COLUMNS, page, PAGE_SIZE, list(sentiments), list(clusters))
+    if store.exists():
+        return store.read_page(RAW_COLUMNS, page, PAGE_SIZE, list(sentiments), list(clusters), search_term)
+
+    df = load_csv()
+    df = df[(df["sentiment"].isin(sentiments)) & (df["cluster"].isin(clusters))]
+    if search_term:
+        df = df[df['text'].str.contains(search_term, case=False, na=False, regex=False)]
+    start = page * PAGE_SIZE
+    return df[RAW_COLUMNS].iloc[start:start + PAGE_SIZE], len(df)
+
 def main():
     st.title("📊 Social Media Analysis Dashboard")
 
-    df = load_data()
+    rollup = load_rollup()
 
-    if df is None:
+    if rollup is None:
         st.error("No results found! Run `python main.py` first to generate data.")
         return
 
     # Sidebar Filters
     st.sidebar.header("Filter Options")
-    
+
     # Filter by Sentiment
     sentiment_filter = st.sidebar.multiselect(
         "Select Sentiment:",
-        options=df["sentiment"].unique(),
-        default=df["sentiment"].unique()
+        options=rollup["sentiment"].unique(),
+        default=rollup["sentiment"].unique()
     )
 
     # Filter by Cluster
     cluster_filter = st.sidebar.multiselect(
         "Select Topic Cluster:",
-        options=sorted(df["cluster"].unique()),
-        default=sorted(df["cluster"].unique())
+        options=sorted(rollup["cluster"].unique()),
+        default=sorted(rollup["cluster"].unique())
     )
 
     # Apply Filters
-    filtered_df = df[
-        (df["sentiment"].isin(sentiment_filter)) &
-        (df["cluster"].isin(cluster_filter))
+    filtered = rollup[
+        (rollup["sentiment"].isin(sentiment_filter)) &
+        (rollup["cluster"].isin(cluster_filter))
     ]
+    sentiment_totals = filtered.groupby("sentiment")["count"].sum()
+    cluster_totals = filtered.groupby("cluster")["count"].sum()
 
     # KPI Metrics Row
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
-        st.metric("Total Posts", len(filtered_df))
-    
+        st.metric("Total Posts", int(filtered["count"].sum()))
+
     with col2:
-        positive_count = len(filtered_df[filtered_df['sentiment'] == 'Positive'])
+        positive_count = int(sentiment_totals.get('Positive', 0))
         st.metric("Positive Posts", positive_count)
-    
+
     with col3:
-        negative_count = len(filtered_df[filtered_df['sentiment'] == 'Negative'])
+        negative_count = int(sentiment_totals.get('Negative', 0))
         st.metric("Negative Posts", negative_count)
 
     with col4:
         # Determine dominant topic
-        if not filtered_df.empty:
-            top_cluster = filtered_df['cluster'].mode()[0]
+        if not filtered.empty:
+            top_cluster = cluster_totals.idxmax()
             st.metric("Dominant Topic ID", int(top_cluster))
         else:
             st.metric("Dominant Topic ID", "N/A")
@@ -78,12 +196,12 @@ def main():
 
     with col_left:
         st.subheader("Sentiment Distribution")
-        sentiment_counts = filtered_df['sentiment'].value_counts().reset_index()
-        sentiment_counts.columns = ['Sentiment', 'Count'] 
-        
+        sentiment_counts = sentiment_totals.sort_values(ascending=False).reset_index()
+        sentiment_counts.columns = ['Sentiment', 'Count']
+
         fig_pie = px.pie(
-            sentiment_counts, 
-            values='Count', 
+            sentiment_counts,
+            values='Count',
             names='Sentiment',
             hole=0.4,
             color='Sentiment',
@@ -95,31 +213,35 @@ def main():
 
     with col_right:
         st.subheader("Topic Cluster Volume")
-        cluster_counts = filtered_df['cluster'].value_counts().reset_index()
+        cluster_counts = cluster_totals.reset_index()
         cluster_counts.columns = ['Cluster ID', 'Count']
         cluster_counts = cluster_counts.sort_values('Cluster ID')
-        
+
         fig_bar = px.bar(
             cluster_counts,
-            x='Cluster ID', 
+            x='Cluster ID',
             y='Count',
             color='Count',
             color_continuous_scale="Viridis",
-            text='Count' 
+            text='Count'
         )
         fig_bar.update_layout(template="plotly_white", showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
+        # One tick per cluster, whatever k the run chose
+        fig_bar.update_xaxes(type="category")
         st.plotly_chart(fig_bar, use_container_width=True)
 
     # Treemap (Topic Keywords)
     st.subheader("Topic > Sentiment Hierarchy")
-    
-    if not filtered_df.empty:
+
+    if not filtered.empty:
+        tree_counts = filtered.groupby(["cluster", "sentiment"], as_index=False)["count"].sum()
         # Add a dummy 'All' column for root node
-        filtered_df["All"] = "Social Media Posts"
-        
+        tree_counts["All"] = "Social Media Posts"
+
         fig_tree = px.treemap(
-            filtered_df, 
-            path=['All', 'cluster', 'sentiment'], 
+            tree_counts,
+            path=['All', 'cluster', 'sentiment'],
+            values='count',
             color='sentiment',
             color_discrete_map={'Positive':'#00cc96', 'Negative':'#ef553b', 'Neutral':'#ffa15a'},
             maxdepth=3
@@ -127,21 +249,80 @@ def main():
         fig_tree.update_layout(template="plotly_white", margin=dict(t=20, b=0, l=0, r=0))
         st.plotly_chart(fig_tree, use_container_width=True)
 
+    # Trends over time
+    st.markdown("---")
+    st.subheader("Trends Over Time")
+    trend_counts = load_trend_counts()
+    if trend_counts is None or trend_counts.empty:
+        st.info("No dated results to build trends from.")
+    else:
+        col_freq, col_level, col_view, col_window = st.columns(4)
+        freq = col_freq.selectbox("Bucket:", options=list(FREQUENCIES))
+        level = col_level.selectbox("Series:", options=["cluster", "sentiment"])
+        view = col_view.radio("Window:", options=["Tumbling", "Sliding"], horizontal=True)
+        window = int(col_window.number_input(f"Sliding window ({freq}s):", min_value=1, value=24 if freq == "hour" else 7))
+
+        series, burst_history, bursts = load_trends(
+            freq, window, level, view == "Sliding",
+            tuple(sentiment_filter), tuple(int(c) for c in cluster_filter)
+        )
+        if level == "cluster":
+            # Discrete colours, one per cluster
+            series = series.astype({"cluster": str})
+            burst_history = burst_history.astype({"cluster": str})
+
+        fig_series = px.line(series, x="start", y="count", color=level,
+                             color_discrete_map={'Positive':'#00cc96', 'Negative':'#ef553b', 'Neutral':'#ffa15a'})
+        fig_series.update_layout(template="plotly_white", margin=dict(t=20, b=0, l=0, r=0),
+                                 xaxis_title=None, yaxis_title="Posts" if view == "Tumbling" else f"Posts (last {window} {freq}s)")
+        st.plotly_chart(fig_series, use_container_width=True)
+
+        col_history, col_bursts = st.columns([2, 1])
+        with col_history:
+            st.caption("Burst score: deviation from the EWMA baseline, in EWMA standard deviations")
+            fig_burst = px.line(burst_history, x="start", y="burst", color=level)
+            fig_burst.add_hline(y=3, line_dash="dot", line_color="#ef553b")
+            fig_burst.update_layout(template="plotly_white", margin=dict(t=20, b=0, l=0, r=0), xaxis_title=None)
+            st.plotly_chart(fig_burst, use_container_width=True)
+        with col_bursts:
+            st.caption(f"Latest {freq}, strongest bursts first")
+            st.dataframe(bursts.round(2), use_container_width=True, hide_index=True)
+
     # Data Table
     st.markdown("---")
     st.subheader("Raw Data Explorer")
     search_term = st.text_input("Search in tweets:", "")
-    
-    if search_term:
-        display_df = filtered_df[filtered_df['text'].str.contains(search_term, case=False, na=False)]
-    else:
-        display_df = filtered_df
+
+    # Raw rows are only read here, one page at a time; the first page also gives the
+    # number of matches, which bounds the page selector
+    page_filters = (tuple(sentiment_filter), tuple(int(c) for c in cluster_filter), search_term)
+    display_df, match_count = load_page(*page_filters, 0)
+    page_count = max((match_count - 1) // PAGE_SIZE + 1, 1)
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    if page > 1:
+        display_df, match_count = load_page(*page_filters, int(page) - 1)
+    st.caption(f"{match_count} matching posts, showing {len(display_df)} (page {int(page)})")
 
     st.dataframe(
-        display_df[['date', 'user', 'text', 'sentiment', 'cluster']],
+        display_df,
         use_container_width=True,
         hide_index=True
     )
 
+    # Nearest neighbours of a post on this page
+    st.markdown("---")
+    st.subheader("Similar Posts")
+    if not similarity_runs():
+        st.info("Run `python main.py` in batch mode with Parquet output to build the similarity index.")
+    elif not display_df.empty:
+        page_texts = dict(zip(display_df["id"], display_df["text"]))
+        tweet_id = st.selectbox("Post:", options=list(page_texts), format_func=lambda i: page_texts[i][:120])
+        k = st.slider("Number of similar posts", min_value=1, max_value=50, value=10)
+        similar_df = load_similar(tweet_id, k)
+        if similar_df.empty:
+            st.caption("No similar posts found.")
+        else:
+            st.dataframe(similar_df, use_container_width=True, hide_index=True)
+
 if __name__ == "__main__":
     main()
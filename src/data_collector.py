@@ -1,154 +1,275 @@
 import pandas as pd
-import random
-import uuid
+import numpy as np
 import os
 import requests
 import zipfile
-import shutil
-from datetime import datetime, timedelta
+import time
+import pyarrow as pa
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
+from src.acquisition import (
+    Manifest, ARROW_CACHE_VERSION, download, find_member, extract_member, csv_to_arrow, read_arrow
+)
+from src.instrumentation import instrumented, metrics
+from src.schema import random_ids
+
 console = Console()
 
 class DataCollector:
-    def __init__(self, topic="Yapay Zeka"):
+    def __init__(self, topic="Yapay Zeka", seed=None, data_dir=None, repo_url=None):
         self.topic = topic
-        self.data_dir = os.path.join(os.path.dirname(__file__), "..", "data")
+        self.rng = np.random.default_rng(seed)
+        self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), "..", "data")
         self.zip_path = os.path.join(self.data_dir, "tweets.zip")
         self.csv_path = os.path.join(self.data_dir, "tweets.csv")
-        self.repo_url = "https://github.com/ezgisubasi/turkish-tweets-sentiment-analysis/archive/refs/heads/master.zip"
+        self.cache_path = os.path.join(self.data_dir, "tweets.arrow")
+        self.repo_url = repo_url or "https://github.com/ezgisubasi/turkish-tweets-sentiment-analysis/archive/refs/heads/master.zip"
         self.users = ["user123", "cool_boy", "tech_savy", "ayse_yilmaz", "mehmet_b", "john_doe", "ai_lover", "skeptic_guy"]
         
         # Ensure data directory exists
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+        self.manifest = Manifest(os.path.join(self.data_dir, "manifest.json"))
 
+    @instrumented("collector.acquire")
     def _download_and_extract_if_needed(self):
-        """Downloads and extracts the dataset if not present."""
-        
-        # 1. Check if tweets.csv exists
-        if os.path.exists(self.csv_path):
+        """
+        Makes sure a verified tweets.csv and its Arrow cache exist.
+        Downloads resume after interruptions, every acquired file is checked against
+        data/manifest.json, and a truncated or corrupted file is fetched again instead
+        of being read.
+        """
+        if self.manifest.verify(self.csv_path):
             console.print(f"[green]✔ Dataset found at {self.csv_path}.[/green]")
-            return
-
-        # 2. Check if tweets.zip exists, if not download
-        if not os.path.exists(self.zip_path):
-            console.print("[yellow]Dataset missing. Downloading tweets.zip...[/yellow]")
+        elif os.path.exists(self.csv_path) and self.manifest.get(self.csv_path) is None:
+            # Placed by hand or acquired before the manifest existed: nothing to compare
+            # it with, so it is adopted as is rather than fetched again
+            self.manifest.record(self.csv_path, source="local")
+            console.print(f"[green]✔ Dataset found at {self.csv_path} (recorded in the manifest).[/green]")
+        else:
+            if os.path.exists(self.csv_path):
+                console.print(f"[yellow]{self.csv_path} does not match the manifest; acquiring it again.[/yellow]")
+            # Whatever was derived from the old file is stale now
+            self.manifest.forget(self.csv_path)
             try:
-                with requests.get(self.repo_url, stream=True) as r:
-                    r.raise_for_status()
-                    total_size = int(r.headers.get('content-length', 0))
-                    
-                    with open(self.zip_path, 'wb') as f, Progress(
-                        SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), TaskProgressColumn()
-                    ) as progress:
-                        task = progress.add_task("[cyan]Downloading...", total=total_size)
-                        for chunk in r.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            progress.update(task, advance=len(chunk))
-                            
-                console.print(f"[green]✔ Download complete: {self.zip_path}[/green]")
-            except Exception as e:
-                console.print(f"[red] Download failed: {e}[/red]")
+                self._acquire_csv()
+            except (requests.exceptions.RequestException, OSError, ValueError, zipfile.BadZipFile) as e:
+                console.print(f"[red] Dataset acquisition failed: {e}[/red]")
+                if os.path.exists(self.csv_path):
+                    console.print(f"[yellow]Using the unverified {self.csv_path}.[/yellow]")
                 return
+        self._ensure_cache()
 
-        # 3. Validating Zip
-        if not os.path.exists(self.zip_path): 
-             console.print(f"[red] Error: {self.zip_path} not found after download attempt.[/red]")
-             return
+    def _acquire_csv(self):
+        """Extracts tweets.csv from tweets.zip, (re-)downloading the zip when missing or corrupt."""
+        for attempt in range(2):
+            if not self.manifest.verify(self.zip_path) and not zipfile.is_zipfile(self.zip_path):
+                self._download_zip()
+            try:
+                member = find_member(self.zip_path, "TurkishTweets.csv")
+                if member is None:
+                    raise ValueError("'TurkishTweets.csv' not found within the zip")
+                console.print("[yellow]Extracting tweets.csv from zip...[/yellow]")
+                # The zip CRC check fails here if the archive is damaged
+                extract_member(self.zip_path, member, self.csv_path)
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError) as e:
+                console.print(f"[red] {self.zip_path} is corrupt ({e}); downloading it again.[/red]")
+                os.remove(self.zip_path)
+                self.manifest.forget(self.zip_path)
+                if attempt:
+                    raise
+                continue
+            self.manifest.record(self.csv_path, source=member)
+            console.print(f"[green]✔ Extracted and renamed to {self.csv_path}.[/green]")
+            return
+
+    def _download_zip(self):
+        console.print("[yellow]Dataset missing. Downloading tweets.zip...[/yellow]")
+        with Progress(
+            SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), TaskProgressColumn()
+        ) as progress:
+            task = progress.add_task("[cyan]Downloading...", total=None)
+            download(
+                self.repo_url, self.zip_path,
+                on_progress=lambda done, total: progress.update(task, completed=done, total=total)
+            )
+        self.manifest.record(self.zip_path, url=self.repo_url)
+        console.print(f"[green]✔ Download complete: {self.zip_path}[/green]")
 
-        # 4. Extracting and Renaming
-        console.print("[yellow]Extracting tweets.csv from zip...[/yellow]")
+    def _cache_is_valid(self):
+        entry = self.manifest.get(self.cache_path)
+        source = self.manifest.get(self.csv_path)
+        return (
+            entry is not None and source is not None
+            and entry.get("source_sha256") == source["sha256"]
+            and entry.get("version") == ARROW_CACHE_VERSION
+            and self.manifest.verify(self.cache_path)
+        )
+
+    def _ensure_cache(self):
+        """Converts the CSV once into a memory-mappable Arrow file (data/tweets.arrow)."""
+        source = self.manifest.get(self.csv_path)
+        if source is None or self._cache_is_valid():
+            return
+        console.print(f"[yellow]Building the columnar cache {self.cache_path}...[/yellow]")
+        start = time.perf_counter()
         try:
-            with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
-                # The file inside the repo structure
-                # We know the structure: turkish-tweets-sentiment-analysis-master/data/TurkishTweets.csv
-                # But let's search for it to be safe
-                target_file = None
-                for file_name in zip_ref.namelist():
-                    if file_name.endswith("TurkishTweets.csv"):
-                        target_file = file_name
-                        break
-                
-                if target_file:
-                    with zip_ref.open(target_file) as source, open(self.csv_path, "wb") as target:
-                        shutil.copyfileobj(source, target)
-                    console.print(f"[green]✔ Extracted and renamed to {self.csv_path}.[/green]")
-                else:
-                    console.print("[red] 'TurkishTweets.csv' not found within the zip.[/red]")
-        except zipfile.BadZipFile:
-            console.print("[red] Error: The downloaded file is not a valid zip.[/red]")
+            rows = csv_to_arrow(lambda: open(self.csv_path, "rb"), self.cache_path)
+        except (pa.ArrowException, OSError) as e:
+            # Not fatal: the CSV is still read directly
+            console.print(f"[red] Could not build the cache ({e}); reading the CSV instead.[/red]")
+            return
+        metrics.record("collector.build_cache", time.perf_counter() - start, rows, os.path.getsize(self.csv_path))
+        self.manifest.record(self.cache_path, source_sha256=source["sha256"], rows=rows,
+                             version=ARROW_CACHE_VERSION)
+        console.print(f"[green]✔ Cached {rows} rows at {self.cache_path}.[/green]")
 
-    def _get_fallback_mock_data(self, count):
-        """Fallback mock data if CSV is missing."""
-        mock_templates = [
-            f"{self.topic} dünyayı değiştirecek! #AI #Gelecek",
-            f"{self.topic} hakkında harika bir makale okudum.",
-            f"Bence {self.topic} biraz abartılıyor. #balon",
-            f"{self.topic} ile ödevlerimi yapıyorum, çok kolaylaştı.",
-            f"Bugünlük {self.topic} dozumuzu aldık. İnanılmaz gelişmeler var.",
+    def _has_dataset(self):
+        return os.path.exists(self.csv_path)
+
+    def _mock_templates(self, topic=None):
+        """Tweet templates used for mock data."""
+        topic = topic or self.topic
+        return [
+            f"{topic} dünyayı değiştirecek! #AI #Gelecek",
+            f"{topic} hakkında harika bir makale okudum.",
+            f"Bence {topic} biraz abartılıyor. #balon",
+            f"{topic} ile ödevlerimi yapıyorum, çok kolaylaştı.",
+            f"Bugünlük {topic} dozumuzu aldık. İnanılmaz gelişmeler var.",
             "Yapay zeka işleri elimizden alacak mı?",
             "AI is shaping the future of humanity.",
             "Just tried a new AI tool, mind blowing!",
             "I'm skeptical about the ethics of AI.",
             "Machine learning is specifically fascinating."
         ]
-        
-        data = []
-        for _ in range(count):
-            data.append({
-                "id": str(uuid.uuid4()),
-                "text": random.choice(mock_templates),
-                "user": random.choice(self.users),
-                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "platform": "Twitter (Mock)"
-            })
-        return data
 
+    def _get_fallback_mock_data(self, count):
+        """Fallback mock records (compact layout) if CSV is missing."""
+        texts = self.rng.choice(np.array(self._mock_templates(), dtype=object), size=count)
+        df = self._enrich(texts, platform="Twitter (Mock)")
+        df["date"] = pd.Timestamp.now().floor("s")
+        return df
+
+    def _enrich(self, texts, platform="Twitter (Dataset)"):
+        """
+        Builds pipeline records (id, text, user, date, platform) for a chunk of texts,
+        in the compact layout of src/schema.py: int64 ids, datetime64 dates and
+        categorical users and platforms. Ids, users and dates are drawn for the whole
+        chunk at once.
+        """
+        n = len(texts)
+
+        # Randomize date within last 30 days
+        minutes_back = self.rng.integers(0, 31, size=n) * 1440 + self.rng.integers(0, 1441, size=n)
+        dates = pd.Timestamp.now().floor("s") - pd.to_timedelta(minutes_back, unit="m")
+
+        return pd.DataFrame({
+            "id": random_ids(self.rng, n),
+            "text": np.asarray(texts, dtype=object),
+            "user": pd.Categorical.from_codes(self.rng.integers(0, len(self.users), size=n), categories=self.users),
+            "date": dates,
+            "platform": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[platform])
+        })
+
+    def _iter_texts(self, chunksize):
+        """
+        Streams non-empty tweet texts in chunks of at most chunksize rows, from the
+        memory-mapped Arrow cache when it is up to date and from the CSV otherwise.
+        """
+        if self._cache_is_valid():
+            yield from self._iter_cached_texts(chunksize)
+            return
+        with open(self.csv_path, "rb") as f:
+            position = 0
+            start = time.perf_counter()
+            for chunk in pd.read_csv(f, usecols=["Tweet"], chunksize=chunksize):
+                # Drop rows with NaN in 'Tweet' column
+                texts = chunk["Tweet"].dropna()
+                metrics.record("collector.read_csv", time.perf_counter() - start, len(chunk), f.tell() - position)
+                position = f.tell()
+                if len(texts):
+                    yield texts.astype(str).to_numpy(dtype=object)
+                start = time.perf_counter()
+
+    def _iter_cached_texts(self, chunksize):
+        tweets = read_arrow(self.cache_path, ["Tweet"]).column("Tweet")
+        start = time.perf_counter()
+        for offset in range(0, len(tweets), chunksize):
+            chunk = tweets.slice(offset, chunksize)
+            texts = chunk.drop_null().to_numpy(zero_copy_only=False).astype(object)
+            metrics.record("collector.read_cache", time.perf_counter() - start, len(chunk), chunk.nbytes)
+            if len(texts):
+                yield texts
+            start = time.perf_counter()
+
+    def _reservoir_sample(self, count, chunksize):
+        """
+        Uniform sample of count texts in one pass over the CSV (reservoir sampling).
+        Memory is bounded by count + chunksize regardless of the file size.
+        """
+        reservoir = []
+        seen = 0
+        for texts in self._iter_texts(chunksize):
+            # Fill the reservoir first, then replace with probability count / position
+            fill = min(max(count - seen, 0), len(texts))
+            reservoir.extend(texts[:fill])
+            rest = texts[fill:]
+            if len(rest):
+                positions = np.arange(seen + fill, seen + len(texts))
+                slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+                for offset in np.flatnonzero(slots < count):
+                    reservoir[slots[offset]] = rest[offset]
+            seen += len(texts)
+
+        order = self.rng.permutation(len(reservoir))
+        return [reservoir[i] for i in order]
+
+    def iter_batches(self, batch_size=10000, sample=None):
+        """
+        Yields enriched record DataFrames of at most batch_size rows.
+        With sample set, yields a uniform random sample of that many tweets instead of
+        the whole dataset. Falls back to mock data when the CSV is missing.
+        """
+        self._download_and_extract_if_needed()
+        yield from self._iter_batches(batch_size, sample)
+
+    def _iter_batches(self, batch_size, sample):
+        if not self._has_dataset():
+            data = self._get_fallback_mock_data(sample or batch_size)
+            for start in range(0, len(data), batch_size):
+                yield data.iloc[start:start + batch_size].reset_index(drop=True)
+            return
+
+        if sample is None:
+            for texts in self._iter_texts(batch_size):
+                yield self._enrich(texts)
+            return
+
+        # Scan in reasonably large chunks even when the sample (and batch) is small
+        texts = self._reservoir_sample(sample, max(batch_size, 10000))
+        for start in range(0, len(texts), batch_size):
+            yield self._enrich(texts[start:start + batch_size])
+
+    @instrumented("collector.generate_data", rows=lambda args, result: len(result))
     def generate_data(self, count=50):
         self._download_and_extract_if_needed()
         
         print(f"Loading real tweets from local dataset...")
         
-        if os.path.exists(self.csv_path):
+        if self._has_dataset():
             try:
-                df = pd.read_csv(self.csv_path)
-                # Drop rows with NaN in 'Tweet' column
-                df = df.dropna(subset=['Tweet'])
-                
-                # Sample random rows
-                if len(df) > count:
-                    sample = df.sample(n=count)
-                else:
-                    sample = df
-                
-                data = []
-                for _, row in sample.iterrows():
-                    # The dataset has 'Tweet' column
-                    text = str(row['Tweet']) # Ensure string
-                    
-                    # Randomize date within last 30 days
-                    days_back = random.randint(0, 30)
-                    date = datetime.now() - timedelta(days=days_back, minutes=random.randint(0, 1440))
-                    
-                    record = {
-                        "id": str(uuid.uuid4()),
-                        "text": text,
-                        "user": random.choice(self.users),
-                        "date": date.strftime("%Y-%m-%d %H:%M:%S"),
-                        "platform": "Twitter (Dataset)"
-                    }
-                    data.append(record)
-                
-                print(f"Successfully loaded {len(data)} tweets from dataset.")
-                return pd.DataFrame(data)
+                # Reservoir sample: memory scales with count, not with the CSV size
+                batches = list(self._iter_batches(batch_size=max(count, 1), sample=count))
+                df = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+                print(f"Successfully loaded {len(df)} tweets from dataset.")
+                return df
                 
             except Exception as e:
                 print(f"Error reading CSV: {e}")
         
         print("CSV not found or error. Using mock data.")
-        return pd.DataFrame(self._get_fallback_mock_data(count))
+        return self._get_fallback_mock_data(count)
 
 if __name__ == "__main__":
     dc = DataCollector()
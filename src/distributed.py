@@ -0,0 +1,581 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import traceback
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src.instrumentation import instrumented
+
+# One job in the shared directory, root/<job id>/. Every file is written under a
+# temporary name and renamed, so a file that exists is complete:
+#   input/shard-00003.parquet     records whose id hashes to shard 3 (+ their input position)
+#   sentiment.joblib              the coordinator's trained sentiment model
+#   job.json                      job parameters, written after the inputs
+#   map/shard-00003.json          rows, sentiment counts, a sample
+#   map/shard-00003.parquet       term and document counts
+#   model.json                    merged vocabulary and IDF weights
+#   stats/shard-00003.npz         column sums and squared sums of the TF-IDF vectors
+#   rounds/00001/centers.npy      centroids of k-means round 1
+#   rounds/00001/shard-00003.npz  per-cluster sums and counts, inertia
+#   final/centers.npy             converged centroids
+#   final/shard-00003.*           labeled records with their vectors (.parquet), cluster counts (.json)
+# A shard that the id hash leaves without rows still writes every file, with empty
+# or zero statistics.
+#   errors/shard-00003.txt        traceback of a failed worker
+#   done.json / failed.json       end of the job
+# root/current.json names the job that workers join.
+
+def shard_of(ids, shards):
+    """
+    Shard of each id: a stable 64-bit hash of the id modulo the shard count, the
+    same on every node and run.
+    """
+    return (pd.util.hash_array(np.asarray(ids)) % np.uint64(shards)).astype(np.int64)
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def _write_json(path, obj):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+    _write_atomic(path, write)
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_text(path, text):
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    _write_atomic(path, write)
+
+def _write_npy(path, array):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+    _write_atomic(path, write)
+
+def _sleeps(poll):
+    """
+    Polling intervals: from 1 ms, doubling up to poll. A file that appears soon (the
+    next k-means round) is noticed at once, a long wait costs few checks.
+    """
+    interval = min(0.001, poll)
+    while True:
+        yield interval
+        interval = min(interval * 2, poll)
+
+def _write_npz_arrays(path, **arrays):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+    _write_atomic(path, write)
+
+# Rows per Parquet row group of a labeled shard: the unit the coordinator streams
+LABELED_ROW_GROUP = 65536
+
+def _write_labeled(path, df, vectors):
+    """
+    Labeled records with their sparse TF-IDF rows as two list columns (column
+    indices, values), so the coordinator can stream both together.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    offsets = pa.array(vectors.indptr, type=pa.int64())
+    table = table.append_column("vector_indices", pa.LargeListArray.from_arrays(
+        offsets, pa.array(vectors.indices, type=pa.int32())))
+    table = table.append_column("vector_values", pa.LargeListArray.from_arrays(
+        offsets, pa.array(vectors.data, type=pa.float64())))
+    pq.write_table(table, path, row_group_size=LABELED_ROW_GROUP)
+
+def _read_vectors(table, n_features):
+    """
+    CSR matrix of the vector list columns of a labeled table (see _write_labeled).
+    """
+    if table.num_rows == 0:
+        return sp.csr_matrix((0, n_features))
+    indices = table.column("vector_indices").combine_chunks()
+    values = table.column("vector_values").combine_chunks()
+    # Offsets of a sliced list array start where the slice does
+    indptr = indices.offsets.to_numpy()
+    return sp.csr_matrix((values.flatten().to_numpy(), indices.flatten().to_numpy(), indptr - indptr[0]),
+                         shape=(table.num_rows, n_features))
+
+class Job:
+    """
+    Paths of one job in the shared directory.
+    """
+    def __init__(self, root, job_id):
+        self.root = root
+        self.id = job_id
+        self.dir = os.path.join(root, job_id)
+
+    def path(self, *parts):
+        return os.path.join(self.dir, *parts)
+
+    def shard_path(self, stage, shard, extension):
+        return self.path(stage, f"shard-{shard:05d}.{extension}")
+
+    def round_path(self, number, name):
+        return self.path("rounds", f"{number:05d}", name)
+
+    def finished(self):
+        return os.path.exists(self.path("done.json")) or os.path.exists(self.path("failed.json"))
+
+def assign(vectors, centers):
+    """
+    Nearest centroid of every row and its squared distance.
+    """
+    from sklearn.metrics import pairwise_distances_argmin_min
+    if vectors.shape[0] == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    labels, distances = pairwise_distances_argmin_min(vectors, centers)
+    return labels, distances ** 2
+
+def cluster_statistics(vectors, labels, n_clusters):
+    """
+    Sufficient statistics of one k-means step over some rows: per-cluster vector
+    sums (k x features) and row counts. Summed over shards they give the new centroids.
+    """
+    indicator = sp.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))),
+                              shape=(n_clusters, vectors.shape[0]))
+    return np.asarray((indicator @ vectors).todense()), np.bincount(labels, minlength=n_clusters)
+
+class ShardWorker:
+    """
+    Runs one shard of a job: preprocessing, sentiment and term counts first, then one
+    k-means assignment step per round the coordinator posts, then labels its rows
+    with the final centroids. Only partial statistics go back until the last step.
+    Any number of workers, on any machines that see the shared directory, can run
+    side by side; each one owns a single shard.
+    """
+    def __init__(self, root, shard, timeout=3600, poll=0.05):
+        self.root = root
+        self.shard = shard
+        self.timeout = timeout
+        self.poll = poll
+
+    def run(self):
+        job = self._join()
+        try:
+            self._run(job)
+        except Exception:
+            _write_text(job.shard_path("errors", self.shard, "txt"), traceback.format_exc())
+            raise
+        return job
+
+    def _join(self):
+        # Workers may start before the coordinator has posted its job
+        deadline = time.monotonic() + self.timeout
+        current = os.path.join(self.root, "current.json")
+        sleeps = _sleeps(self.poll)
+        while True:
+            if os.path.exists(current):
+                job = Job(self.root, _read_json(current)["job"])
+                if os.path.exists(job.path("job.json")) and not job.finished():
+                    return job
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No job posted in {self.root}")
+            time.sleep(next(sleeps))
+
+    def _wait(self, job, *paths):
+        """
+        Blocks until one of paths exists and returns it.
+        """
+        deadline = time.monotonic() + self.timeout
+        sleeps = _sleeps(self.poll)
+        while True:
+            for path in paths:
+                if os.path.exists(path):
+                    return path
+            if os.path.exists(job.path("failed.json")):
+                raise RuntimeError(f"Job {job.id} was abandoned by the coordinator")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {paths[0]}")
+            time.sleep(next(sleeps))
+
+    def _run(self, job):
+        import joblib
+        from src.preprocessor import Preprocessor
+        from src.sentiment_analyzer import SentimentAnalyzer
+        from src.clustering import TopicClusterer
+        from src.features import BatchFeatures
+
+        params = _read_json(job.path("job.json"))
+        # Input position order, which iter_results relies on when it merges the shards
+        df = pd.read_parquet(job.shard_path("input", self.shard, "parquet"))
+        df = df.sort_values("row", kind="stable", ignore_index=True)
+
+        # Map: the same preprocessing and sentiment model as a single-process run
+        preprocessor = Preprocessor(stem_cache_path=params["stem_cache_path"], stemmer=params["stemmer"])
+        processed = preprocessor.process_batch(df["text"]).tolist()
+        features = BatchFeatures.from_texts(processed)
+        if len(df):
+            analyzer = SentimentAnalyzer.from_model(joblib.load(job.path("sentiment.joblib")))
+            sentiments = analyzer.predict_batch(processed, features=features)
+        else:
+            sentiments = np.empty(0, dtype=object)
+        self._map_partial(job, params, df, processed, features, sentiments)
+
+        # Vectors in the merged vocabulary, kept for every round
+        model = _read_json(self._wait(job, job.path("model.json")))
+        clusterer = TopicClusterer.from_statistics(model["vocabulary"], model["idf"])
+        if len(df):
+            vectors = clusterer.transform(processed, features).tocsr()
+        else:
+            vectors = sp.csr_matrix((0, len(model["vocabulary"])))
+        _write_npz_arrays(job.shard_path("stats", self.shard, "npz"),
+                          sums=np.asarray(vectors.sum(axis=0)).ravel(),
+                          squares=np.asarray(vectors.multiply(vectors).sum(axis=0)).ravel())
+
+        final = job.path("final", "centers.npy")
+        number = 1
+        while self._wait(job, job.round_path(number, "centers.npy"), final) != final:
+            self._round(job, number, vectors)
+            number += 1
+
+        labels, _ = assign(vectors, np.load(final))
+        df["processed_text"] = pd.Series(processed, dtype=object)
+        df["sentiment"] = pd.Series(sentiments, dtype=object)
+        df["cluster"] = labels
+        _write_atomic(job.shard_path("final", self.shard, "parquet"),
+                      lambda tmp_path: _write_labeled(tmp_path, df, vectors))
+        counts = np.bincount(labels, minlength=len(np.load(final)))
+        # Written last: the coordinator reads the shard once this file exists
+        _write_json(job.shard_path("final", self.shard, "json"), {"cluster_counts": counts.tolist()})
+
+    @instrumented("distributed.map", rows=lambda args, result: len(args[3]))
+    def _map_partial(self, job, params, df, processed, features, sentiments):
+        from src.clustering import stratified_sample
+        term_counts = np.asarray(features.counts.sum(axis=0)).ravel()
+        # CSR rows hold each term once, so column occurrences are document counts
+        doc_counts = np.bincount(features.counts.indices, minlength=len(features.terms))
+        sample = stratified_sample(len(df), params["sample_per_shard"], strata=sentiments,
+                                   seed=params["seed"] + self.shard)
+        labels, counts = np.unique(np.asarray(sentiments, dtype=object).astype(str), return_counts=True)
+        terms = pd.DataFrame({"term": pd.Series(features.terms, dtype=object), "count": term_counts, "docs": doc_counts})
+        _write_atomic(job.shard_path("map", self.shard, "parquet"),
+                      lambda tmp_path: terms.to_parquet(tmp_path, index=False))
+        # Written last: the coordinator reads the partial once this file exists
+        _write_json(job.shard_path("map", self.shard, "json"), {
+            "rows": len(df),
+            "sentiment_counts": dict(zip(labels.tolist(), counts.tolist())),
+            "sample_texts": [processed[row] for row in sample],
+            "sample_sentiments": [str(sentiments[row]) for row in sample],
+        })
+
+    @instrumented("distributed.round", rows=lambda args, result: args[3].shape[0])
+    def _round(self, job, number, vectors):
+        centers = np.load(job.round_path(number, "centers.npy"))
+        labels, distances = assign(vectors, centers)
+        sums, counts = cluster_statistics(vectors, labels, len(centers))
+        _write_npz_arrays(job.round_path(number, f"shard-{self.shard:05d}.npz"),
+                          sums=sums, counts=counts, inertia=distances.sum())
+
+def run_worker(root, shard, timeout=3600):
+    """
+    Entry point of a worker process (local pool or `main.py --worker SHARD` on another node).
+    """
+    ShardWorker(root, shard, timeout=timeout).run()
+
+class _ShardCursor:
+    """
+    Streams one labeled shard (rows in input order) in input-position ranges.
+    """
+    def __init__(self, job, shard, batch_size):
+        import pyarrow.parquet as pq
+        self.batches = pq.ParquetFile(job.shard_path("final", shard, "parquet")).iter_batches(batch_size=batch_size)
+        self.buffer = None
+
+    def take(self, end):
+        """
+        Table of the rows before input position end that were not taken yet, or None.
+        """
+        import pyarrow as pa
+        while self.buffer is None or self.buffer.column("row")[-1].as_py() < end:
+            batch = next(self.batches, None)
+            if batch is None:
+                break
+            table = pa.Table.from_batches([batch])
+            self.buffer = table if self.buffer is None else pa.concat_tables([self.buffer, table])
+        if self.buffer is None:
+            return None
+        count = int(np.searchsorted(self.buffer.column("row").to_numpy(), end))
+        taken = self.buffer.slice(0, count)
+        self.buffer = self.buffer.slice(count) if count < self.buffer.num_rows else None
+        return taken
+
+class Coordinator:
+    """
+    Batch analysis split across hash-of-id shards. The coordinator writes each
+    shard's records to the shared directory and merges what the workers send back:
+    - after the map step, sentiment counts and term/document counts (the top
+      max_features terms and their IDF give the same TF-IDF space as a
+      single-process run) plus a stratified sample that seeds the centroids,
+    - once the vocabulary is fixed, column sums and squared sums of the TF-IDF
+      vectors (the mean and variance that set the convergence tolerance),
+    - after every k-means round, per-cluster sums and counts, from which the next
+      centroids follow exactly (Lloyd's algorithm, distributed),
+    - at the end, labeled shards that are merged back into input order and
+      streamed to the outputs one batch at a time.
+    """
+    def __init__(self, root, shards, n_clusters="auto", k_range=(2, 10), sample_size=5000, max_features=1000,
+                 max_iter=100, tol=1e-4, seed=42, timeout=3600, poll=0.05):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.root = root
+        self.shards = shards
+        self.n_clusters = n_clusters
+        self.k_range = k_range
+        self.sample_size = sample_size
+        self.max_features = max_features
+        self.max_iter = max_iter
+        self.tol = tol
+        self.seed = seed
+        self.timeout = timeout
+        self.poll = poll
+
+        self.job = None
+        self.processes = []
+        self.rows = 0
+        self.sentiment_counts = {}
+        self.cluster_counts = {}
+        self.initial_centers = None
+        self.rounds = 0
+        self.n_features = None
+
+    def _clean(self):
+        # Jobs that ended are removed; a job still running elsewhere is left alone
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            job = Job(self.root, name)
+            if os.path.isdir(job.dir) and job.finished():
+                shutil.rmtree(job.dir, ignore_errors=True)
+
+    @instrumented("distributed.submit", rows=lambda args, result: args[0].rows)
+    def submit(self, batches, analyzer, preprocessor):
+        """
+        Splits record batches (e.g. DataCollector.iter_batches) into shard files,
+        ships the fitted sentiment model and posts the job. Memory stays at one batch.
+        """
+        import joblib
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._clean()
+        self.job = Job(self.root, uuid.uuid4().hex[:12])
+        os.makedirs(self.job.path("input"))
+        writers = {}
+        schema = None
+        try:
+            for batch in batches:
+                batch = batch.assign(row=np.arange(self.rows, self.rows + len(batch), dtype=np.int64))
+                self.rows += len(batch)
+                for shard, part in batch.groupby(shard_of(batch["id"], self.shards), sort=False):
+                    table = pa.Table.from_pandas(part, preserve_index=False)
+                    schema = schema or table.schema
+                    if shard not in writers:
+                        writers[shard] = pq.ParquetWriter(self.job.shard_path("input", shard, "parquet.tmp"), schema)
+                    writers[shard].write_table(table.cast(schema))
+            if schema is None:
+                raise ValueError("No records to analyze")
+            for shard in range(self.shards):
+                if shard not in writers:
+                    writers[shard] = pq.ParquetWriter(self.job.shard_path("input", shard, "parquet.tmp"), schema)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        for shard in range(self.shards):
+            path = self.job.shard_path("input", shard, "parquet")
+            os.replace(path + ".tmp", path)
+
+        _write_atomic(self.job.path("sentiment.joblib"), lambda tmp_path: joblib.dump(analyzer.fitted_model(), tmp_path))
+        _write_json(self.job.path("job.json"), {
+            "shards": self.shards,
+            "rows": self.rows,
+            "stemmer": preprocessor.stemmer_name,
+            "stem_cache_path": preprocessor.stem_cache_path,
+            "seed": self.seed,
+            "sample_per_shard": -(-self.sample_size // self.shards),
+        })
+        _write_json(os.path.join(self.root, "current.json"), {"job": self.job.id})
+        return self.job
+
+    def start_local_workers(self, shards=None):
+        """
+        Runs workers for the given shards (all by default) as local processes.
+        Shards left out are expected from workers started elsewhere.
+        """
+        # spawn: each worker starts from a fresh interpreter, like a worker on another node
+        context = multiprocessing.get_context("spawn")
+        for shard in range(self.shards) if shards is None else shards:
+            process = context.Process(target=run_worker, args=(self.root, shard, self.timeout),
+                                      name=f"shard-{shard}", daemon=True)
+            process.start()
+            self.processes.append(process)
+        return self.processes
+
+    def _check(self):
+        errors = self.job.path("errors")
+        if os.path.isdir(errors) and os.listdir(errors):
+            name = sorted(os.listdir(errors))[0]
+            with open(os.path.join(errors, name), encoding="utf-8") as f:
+                raise RuntimeError(f"Worker {name[:-4]} failed:\n{f.read()}")
+        for process in self.processes:
+            if process.exitcode not in (None, 0):
+                raise RuntimeError(f"Worker {process.name} exited with code {process.exitcode}")
+
+    def _wait_all(self, paths):
+        deadline = time.monotonic() + self.timeout
+        pending = list(paths)
+        sleeps = _sleeps(self.poll)
+        while True:
+            pending = [path for path in pending if not os.path.exists(path)]
+            if not pending:
+                return paths
+            self._check()
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {pending[0]}")
+            time.sleep(next(sleeps))
+
+    def fail(self):
+        """
+        Marks the job as abandoned so waiting workers stop.
+        """
+        if self.job is not None:
+            _write_json(self.job.path("failed.json"), {})
+
+    def finish(self):
+        _write_json(self.job.path("done.json"), {})
+        for process in self.processes:
+            process.join()
+
+    @instrumented("distributed.merge_map")
+    def merge_map(self):
+        """
+        Merges the map partials: sentiment counts, the vocabulary (top max_features
+        terms by frequency, like CountVectorizer) with its IDF weights, and the samples.
+        Returns (vocabulary, idf, sample texts, sample sentiments).
+        """
+        partials = [_read_json(path) for path in
+                    self._wait_all([self.job.shard_path("map", shard, "json") for shard in range(self.shards)])]
+        for partial in partials:
+            for label, count in partial["sentiment_counts"].items():
+                self.sentiment_counts[label] = self.sentiment_counts.get(label, 0) + count
+
+        counts = pd.concat([
+            pd.read_parquet(self.job.shard_path("map", shard, "parquet")) for shard in range(self.shards)
+        ]).groupby("term", sort=True).sum()
+        # Most frequent first, ties in term order (BatchFeatures.select / CountVectorizer)
+        order = np.argsort(-counts["count"].to_numpy(), kind="stable")[:self.max_features]
+        vocabulary = counts.iloc[np.sort(order)]
+        n_rows = sum(partial["rows"] for partial in partials)
+        # TfidfTransformer's smoothed IDF
+        idf = np.log((1 + n_rows) / (1 + vocabulary["docs"].to_numpy())) + 1
+        _write_json(self.job.path("model.json"), {"vocabulary": vocabulary.index.tolist(), "idf": idf.tolist()})
+        self.n_features = len(vocabulary)
+
+        texts = [text for partial in partials for text in partial["sample_texts"]]
+        strata = [label for partial in partials for label in partial["sample_sentiments"]]
+        return vocabulary.index.tolist(), idf, texts, strata
+
+    def _initial_centers(self, clusterer, texts, strata):
+        from sklearn.cluster import KMeans
+        from src.clustering import select_k
+        sample = clusterer.transform(texts)
+        if self.n_clusters == "auto":
+            low, high = self.k_range
+            k, centers, k_scores = select_k(sample, range(low, high + 1), self.sample_size, strata)
+            return centers, k_scores
+        if sample.shape[0] < self.n_clusters:
+            raise ValueError(f"Not enough rows ({sample.shape[0]}) for {self.n_clusters} clusters")
+        model = KMeans(n_clusters=self.n_clusters, random_state=self.seed, n_init="auto").fit(sample)
+        return model.cluster_centers_, None
+
+    @instrumented("distributed.kmeans")
+    def fit_clusters(self):
+        """
+        Merges the map step, seeds the centroids on the merged sample and runs k-means
+        rounds until the centroids move less than tol (relative to the data variance,
+        as in scikit-learn) or max_iter rounds. Returns a TopicClusterer holding the
+        merged vocabulary, IDF and final centroids.
+        """
+        from src.clustering import TopicClusterer
+
+        vocabulary, idf, texts, strata = self.merge_map()
+        clusterer = TopicClusterer.from_statistics(vocabulary, idf)
+        centers, k_scores = self._initial_centers(clusterer, texts, strata)
+        self.initial_centers = centers
+
+        # Mean and variance of the whole TF-IDF matrix, for the tolerance and predict()
+        sums, squares = 0, 0
+        for path in self._wait_all([self.job.shard_path("stats", shard, "npz") for shard in range(self.shards)]):
+            with np.load(path) as partial:
+                sums = sums + partial["sums"]
+                squares = squares + partial["squares"]
+        n_rows = self.rows
+        mean = sums / n_rows
+        tolerance = self.tol * np.mean(squares / n_rows - mean ** 2)
+
+        for number in range(1, self.max_iter + 1):
+            _write_npy(self.job.round_path(number, "centers.npy"), centers)
+            paths = self._wait_all([self.job.round_path(number, f"shard-{shard:05d}.npz") for shard in range(self.shards)])
+            sums, counts = 0, 0
+            for path in paths:
+                with np.load(path) as partial:
+                    sums = sums + partial["sums"]
+                    counts = counts + partial["counts"]
+            # Empty clusters keep their centroid
+            updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+            shift = ((updated - centers) ** 2).sum()
+            centers = updated
+            self.rounds = number
+            if shift <= tolerance:
+                break
+
+        _write_npy(self.job.path("final", "centers.npy"), centers)
+        return clusterer.with_centers(centers, global_mean=mean, n_seen=int(n_rows), k_scores=k_scores)
+
+    def iter_results(self, batch_size=50000):
+        """
+        Yields (records, vectors) in input order, batch_size input rows at a time,
+        once every shard is labeled; records are in the compact schema of
+        src/schema.py. Shards are streamed front to back side by side, records and
+        vectors together, so memory holds about one batch rather than the dataset.
+        """
+        import pyarrow as pa
+        from src.schema import intern_texts, categorical, cluster_ids
+
+        paths = self._wait_all([self.job.shard_path("final", shard, "json") for shard in range(self.shards)])
+        for path in paths:
+            for cluster_id, count in enumerate(_read_json(path)["cluster_counts"]):
+                if count:
+                    self.cluster_counts[cluster_id] = self.cluster_counts.get(cluster_id, 0) + count
+
+        cursors = [_ShardCursor(self.job, shard, batch_size) for shard in range(self.shards)]
+        for end in range(batch_size, self.rows + batch_size, batch_size):
+            tables = [table for table in (cursor.take(end) for cursor in cursors) if table is not None and table.num_rows]
+            if not tables:
+                continue
+            table = pa.concat_tables(tables, promote_options="permissive")
+            order = np.argsort(table.column("row").to_numpy(), kind="stable")
+            vectors = _read_vectors(table, self.n_features)[order]
+            df = table.drop_columns(["vector_indices", "vector_values"]).to_pandas()
+            df = df.iloc[order].drop(columns="row").reset_index(drop=True)
+            df["processed_text"] = intern_texts(df["processed_text"])
+            df["sentiment"] = categorical(df["sentiment"])
+            df["cluster"] = cluster_ids(df["cluster"])
+            yield df, vectors
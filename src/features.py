@@ -0,0 +1,107 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from src.instrumentation import instrumented
+
+# sklearn's default word tokenization; vectorizers using it can reuse shared counts
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+def shares_tokenization(vectorizer):
+    """
+    True when vectorizer splits text exactly like BatchFeatures, so its output
+    can be computed from the shared counts instead of re-tokenizing.
+    """
+    return (
+        isinstance(vectorizer, (CountVectorizer, HashingVectorizer))
+        and vectorizer.analyzer == "word"
+        and vectorizer.tokenizer is None
+        and vectorizer.preprocessor is None
+        and vectorizer.strip_accents is None
+        and vectorizer.lowercase
+        and vectorizer.token_pattern == TOKEN_PATTERN
+        and tuple(vectorizer.ngram_range) == (1, 1)
+    )
+
+class BatchFeatures:
+    """
+    Token counts of one batch, computed once and shared by every model reading the batch.
+    counts is a CSR matrix (documents x terms) over the batch's own sorted vocabulary;
+    project() maps it into a fitted vectorizer's feature space with one sparse product.
+    """
+    def __init__(self, texts, counts, terms):
+        self.texts = texts
+        self.counts = counts
+        self.terms = terms
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    @classmethod
+    @instrumented("features.extract", rows=lambda args, result: len(result))
+    def from_texts(cls, texts):
+        texts = list(texts)
+        vectorizer = CountVectorizer(token_pattern=TOKEN_PATTERN, dtype=np.int32)
+        try:
+            counts = vectorizer.fit_transform(texts).tocsr()
+            terms = vectorizer.get_feature_names_out()
+        except ValueError:
+            # Batch without a single token
+            counts = sp.csr_matrix((len(texts), 0), dtype=np.int32)
+            terms = np.empty(0, dtype=object)
+        return cls(texts, counts, terms)
+
+    def _mapping(self, vectorizer):
+        """
+        Sparse (batch terms x vectorizer features) matrix sending each term to its column(s).
+        """
+        if isinstance(vectorizer, HashingVectorizer):
+            # A single-term document lands in one bucket with its sign (stop words in none)
+            mapping = vectorizer.transform(self.terms).tocsr()
+            mapping.data = np.sign(mapping.data)
+            return mapping
+
+        vocabulary = vectorizer.vocabulary_
+        columns = np.fromiter((vocabulary.get(term, -1) for term in self.terms), dtype=np.intp, count=len(self.terms))
+        rows = np.flatnonzero(columns >= 0)
+        return sp.csr_matrix(
+            (np.ones(len(rows), dtype=self.counts.dtype), (rows, columns[rows])),
+            shape=(len(self.terms), len(vocabulary))
+        )
+
+    def project(self, vectorizer):
+        """
+        Returns what vectorizer.transform(texts) would, computed from the shared counts.
+        Vectorizers with a different tokenization fall back to transforming the texts.
+        """
+        if not shares_tokenization(vectorizer):
+            return vectorizer.transform(self.texts)
+
+        matrix = self.counts @ self._mapping(vectorizer)
+        if vectorizer.binary:
+            matrix.data[:] = 1
+        if isinstance(vectorizer, HashingVectorizer) and vectorizer.norm is not None:
+            matrix = normalize(matrix, norm=vectorizer.norm, copy=False)
+        return matrix.astype(vectorizer.dtype, copy=False)
+
+    def take(self, rows):
+        """
+        Features of a subset of the batch's rows (same term columns).
+        """
+        rows = np.asarray(rows)
+        return BatchFeatures([self.texts[row] for row in rows], self.counts[rows], self.terms)
+
+    def select(self, max_features):
+        """
+        The max_features most frequent terms, in vocabulary order, with their count columns.
+        Mirrors CountVectorizer(max_features=...) fitted on this batch.
+        """
+        frequencies = np.asarray(self.counts.sum(axis=0)).ravel()
+        # Terms absent from these rows (after take()) are not part of their vocabulary
+        present = np.flatnonzero(frequencies)
+        if len(present) > max_features:
+            present = np.sort(present[np.argsort(-frequencies[present], kind="stable")[:max_features]])
+        if len(present) == len(self.terms):
+            return self.terms, self.counts
+        return self.terms[present], self.counts[:, present]
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+
+import numpy as np
+
+from src.data_collector import DataCollector
+from src.preprocessor import Preprocessor
+from src.sentiment_analyzer import SentimentAnalyzer
+from src.model_store import ModelStore
+
+class LatencyStats:
+    """
+    Request counters plus a sliding window of latencies for p50/p99.
+    """
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.batches = 0
+        self.batched_items = 0
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_items += size
+
+    def record_request(self, seconds):
+        self.requests += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        latencies = np.fromiter(self.latencies, dtype=float, count=len(self.latencies))
+        p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (0.0, 0.0)
+        return {
+            "requests": self.requests,
+            "uptime_sec": uptime,
+            "throughput_rps": self.requests / uptime if uptime else 0.0,
+            "latency_p50_ms": float(p50),
+            "latency_p99_ms": float(p99),
+            "batches": self.batches,
+            "avg_batch_size": self.batched_items / self.batches if self.batches else 0.0
+        }
+
+class MicroBatcher:
+    """
+    Coalesces concurrent predict calls into batches of at most max_batch_size,
+    waiting at most max_wait_ms for a batch to fill. Each batch is preprocessed
+    and scored with one predict_batch call on a worker thread.
+    """
+    def __init__(self, analyzer, preprocessor, stats, max_batch_size=64, max_wait_ms=5):
+        self.analyzer = analyzer
+        self.preprocessor = preprocessor
+        self.stats = stats
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    def _score(self, texts):
+        processed = self.preprocessor.process_batch(texts)
+        return [str(label) for label in self.analyzer.predict_batch(processed)]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                labels = await loop.run_in_executor(None, self._score, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch))
+            for (_, future), label in zip(batch, labels):
+                if not future.done():
+                    future.set_result(label)
+
+class InferenceServer:
+    """
+    Minimal asyncio HTTP/1.1 server (keep-alive) in front of a MicroBatcher.
+
+    POST /predict  {"text": "..."} or {"texts": [...]}
+    GET  /metrics  latency percentiles, throughput and batching stats
+    GET  /health
+    """
+    def __init__(self, analyzer, preprocessor, host="127.0.0.1", port=8765, max_batch_size=64, max_wait_ms=5):
+        self.host = host
+        self.port = port
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(analyzer, preprocessor, self.stats, max_batch_size, max_wait_ms)
+        self.server = None
+
+    async def start(self):
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self._route(method, path, body)
+                except Exception as e:
+                    # A failing request must not take the connection (or the server) down
+                    status, payload = "500 Internal Server Error", {"error": f"{type(e).__name__}: {e}"}
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return "200 OK", {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return "200 OK", self.stats.snapshot()
+        if method == "POST" and path == "/predict":
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                return "400 Bad Request", {"error": "Body must be JSON"}
+            if not isinstance(request, dict):
+                return "400 Bad Request", {"error": "Body must be a JSON object"}
+            if "texts" in request and not isinstance(request["texts"], list):
+                return "400 Bad Request", {"error": "'texts' must be a list"}
+
+            start = time.perf_counter()
+            if "texts" in request:
+                labels = await asyncio.gather(*(self.batcher.predict(str(t)) for t in request["texts"]))
+                result = {"sentiments": list(labels)}
+            elif "text" in request:
+                result = {"sentiment": await self.batcher.predict(str(request["text"]))}
+            else:
+                return "400 Bad Request", {"error": "Expected 'text' or 'texts'"}
+            self.stats.record_request(time.perf_counter() - start)
+            return "200 OK", result
+        return "404 Not Found", {"error": f"No route for {method} {path}"}
+
+def load_analyzer(preprocessor):
+    """
+    Loads the sentiment model once: corpus-trained when TurkishTweets.csv is present
+    (reused from the model store), the mock model otherwise.
+    """
+    collector = DataCollector()
+    analyzer = SentimentAnalyzer(model_store=ModelStore(os.path.join(collector.data_dir, "models")))
+    if os.path.exists(collector.csv_path):
+        analyzer.train_from_corpus(collector.csv_path, preprocessor=preprocessor)
+    else:
+        analyzer.train_mock_model()
+    return analyzer
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching sentiment inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    preprocessor = Preprocessor()
+    analyzer = load_analyzer(preprocessor)
+    server = InferenceServer(analyzer, preprocessor, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    print(f"Serving on http://{args.host}:{args.port} (max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+if __name__ == "__main__":
+    main()
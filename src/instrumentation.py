@@ -0,0 +1,102 @@
+import sys
+import json
+import time
+import functools
+import threading
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes_read = 0
+        # Process-wide peak when the stage last ran, not the stage's own peak:
+        # ru_maxrss never goes down, so earlier stages' peaks show through
+        self.process_peak_rss_mb = None
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "rows": self.rows,
+            "rows_per_sec": self.rows / self.seconds if self.seconds else 0.0,
+            "bytes_read": self.bytes_read,
+            "process_peak_rss_mb": self.process_peak_rss_mb
+        }
+
+class Instrumentation:
+    """
+    Process-wide per-stage timers and counters (calls, seconds, rows, bytes read,
+    and the process's peak RSS so far at the end of the stage). Stages are named "<component>.<operation>".
+    """
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        return stats
+
+    def record(self, name, seconds, rows=0, bytes_read=0):
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.rows += rows
+            stats.bytes_read += bytes_read
+            stats.process_peak_rss_mb = peak_rss_mb()
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+    def report(self):
+        with self._lock:
+            return {
+                "stages": [stats.as_dict() for stats in self.stages.values()],
+                "peak_rss_mb": peak_rss_mb()
+            }
+
+    def write_json(self, path, **extra):
+        """
+        Writes report() plus any extra top-level fields (e.g. wall_seconds) to path.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.report(), **extra}, f, indent=2)
+
+# Shared by every component in the process
+metrics = Instrumentation()
+
+def instrumented(stage, rows=None):
+    """
+    Decorator recording each call's wall time under stage.
+    rows(args, result) returns the number of rows handled by the call.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            metrics.record(stage, time.perf_counter() - start, rows(args, result) if rows else 0)
+            return result
+        return wrapper
+    return decorator
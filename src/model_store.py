@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+import sklearn
+
+class ModelStore:
+    """
+    Local artifact directory for fitted models.
+    Each artifact is keyed by a hash of its training data and parameters, so a
+    changed dataset or configuration never reuses a stale model. Arrays are stored
+    uncompressed and loaded memory-mapped, letting several worker processes share
+    large centroid / probability matrices through the page cache instead of copying.
+    Only the keep most recently used artifacts of each name are kept (None = all):
+    a changed input writes a new artifact, and older ones would pile up otherwise.
+    """
+    def __init__(self, root, keep=5):
+        self.root = root
+        self.keep = keep
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+
+    @staticmethod
+    def make_key(data, params):
+        """
+        Hashes the training data, the model parameters and the scikit-learn version.
+        """
+        digest = hashlib.sha256()
+        digest.update(sklearn.__version__.encode("utf-8"))
+        digest.update(repr(params).encode("utf-8"))
+        for item in data:
+            digest.update(repr(item).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    def path(self, name, key):
+        return os.path.join(self.root, f"{name}-{key}")
+
+    def exists(self, name, key):
+        manifest = os.path.join(self.path(name, key), "manifest.json")
+        if not os.path.exists(manifest):
+            return False
+        # A hit counts as a use for prune()
+        os.utime(manifest)
+        return True
+
+    def save(self, name, key, obj, params=None, metadata=None):
+        """
+        Writes obj under name/key. The artifact directory appears atomically.
+        metadata (JSON-serializable) is kept in the manifest.
+        """
+        target = self.path(name, key)
+        staging = tempfile.mkdtemp(prefix=f".{name}-", dir=self.root)
+        try:
+            joblib.dump(obj, os.path.join(staging, "model.joblib"))
+            manifest = {
+                "name": name,
+                "key": key,
+                "params": repr(params),
+                "sklearn_version": sklearn.__version__,
+                "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "metadata": metadata or {}
+            }
+            with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            if os.path.exists(target):
+                shutil.rmtree(target)
+            os.replace(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if self.keep is not None:
+            self.prune(name, self.keep)
+        return target
+
+    def prune(self, name, keep):
+        """
+        Deletes all but the keep most recently used artifacts saved under name, ranked
+        by manifest mtime (refreshed by exists() and load()). Returns the removed paths.
+        """
+        artifacts = []
+        for entry in os.scandir(self.root):
+            manifest = os.path.join(entry.path, "manifest.json")
+            if entry.is_dir() and entry.name.rsplit("-", 1)[0] == name and os.path.exists(manifest):
+                artifacts.append((os.path.getmtime(manifest), entry.path))
+        artifacts.sort(reverse=True)
+        removed = [path for _, path in artifacts[keep:]]
+        for path in removed:
+            shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+    def read_manifest(self, name, key):
+        with open(os.path.join(self.path(name, key), "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, name, key, mmap=True):
+        """
+        Loads the artifact saved under name/key, memory-mapping its arrays by default.
+        """
+        os.utime(os.path.join(self.path(name, key), "manifest.json"))
+        return joblib.load(os.path.join(self.path(name, key), "model.joblib"),
+                           mmap_mode="r" if mmap else None)
@@ -0,0 +1,169 @@
+import os
+import uuid
+import queue
+import threading
+
+from src.features import BatchFeatures
+from src.schema import intern_texts, categorical, cluster_ids
+
+# Marks the end of a prefetch stream
+_DONE = object()
+
+def prefetch(iterable, depth=2):
+    """
+    Consumes iterable on a background thread, buffering at most depth items.
+    The bounded queue provides backpressure: the producer blocks while the
+    consumer is behind, so memory stays at depth batches per stage.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+    errors = []
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stopped.set()
+
+class StreamingPipeline:
+    """
+    Runs collect -> preprocess -> features -> sentiment -> cluster -> write as chained generator
+    stages, one bounded batch at a time. Results are appended to the output CSV and/or
+    ResultsStore as each batch completes, so peak memory follows the batch size, not the dataset.
+    Each batch is tokenized once; the sentiment and cluster stages share its BatchFeatures.
+    """
+    def __init__(self, collector, preprocessor, analyzer, clusterer,
+                 output_path="results_output.csv", results_store=None, overlap=False, prefetch_depth=2, workers=1,
+                 trends=None, chunksize=5000):
+        self.collector = collector
+        self.preprocessor = preprocessor
+        self.analyzer = analyzer
+        self.clusterer = clusterer
+        self.output_path = output_path
+        self.results_store = results_store
+        self.overlap = overlap
+        self.prefetch_depth = prefetch_depth
+        # 0 = all cores; a single worker preprocesses in-process
+        self.workers = workers or os.cpu_count() or 1
+        # Tweets per chunk handed to each preprocessing worker
+        self.chunksize = chunksize
+        # Preprocessing pool, started on the first parallel batch and reused until close()
+        self._pool = None
+        # Optional TrendEngine, updated with every finished batch
+        self.trends = trends
+
+        self.rows = 0
+        self.sentiment_counts = {}
+        self.cluster_counts = {}
+
+    def _stage(self, batches):
+        # With overlap, each stage runs on its own thread behind a bounded queue
+        if self.overlap:
+            return prefetch(batches, self.prefetch_depth)
+        return batches
+
+    def preprocess_stage(self, batches):
+        for batch in batches:
+            if self.workers != 1:
+                if self._pool is None:
+                    self._pool = self.preprocessor.open_pool(self.workers)
+                processed = self.preprocessor.process_parallel(batch['text'], chunksize=self.chunksize,
+                                                               pool=self._pool)
+            else:
+                processed = self.preprocessor.process_batch(batch['text'])
+            batch['processed_text'] = intern_texts(processed)
+            yield batch
+
+    def feature_stage(self, batches):
+        # Yields (batch, features) pairs until the write stage
+        for batch in batches:
+            yield batch, BatchFeatures.from_texts(batch['processed_text'])
+
+    def sentiment_stage(self, batches):
+        for batch, features in batches:
+            batch['sentiment'] = categorical(self.analyzer.predict_batch(batch['processed_text'], features=features))
+            yield batch, features
+
+    def cluster_stage(self, batches):
+        fitted = False
+        for batch, features in batches:
+            texts = batch['processed_text']
+            if self.clusterer.online:
+                # Centroids absorb every batch at a constant cost per batch
+                self.clusterer.partial_fit(texts, features)
+                labels = self.clusterer.predict(texts, features)
+            elif fitted:
+                labels = self.clusterer.predict(texts, features)
+            else:
+                # Topics are discovered on the first batch and reused for the rest
+                labels = self.clusterer.cluster(texts, features, strata=batch['sentiment'])
+                fitted = True
+            batch['cluster'] = cluster_ids(labels)
+            yield batch, features
+
+    def write_stage(self, batches):
+        first = True
+        run_id = uuid.uuid4().hex[:12]
+        for number, (batch, _) in enumerate(batches):
+            if self.output_path:
+                batch.to_csv(self.output_path, mode='w' if first else 'a', header=first, index=False)
+            if self.results_store is not None:
+                self.results_store.append(batch, run_id=f"{run_id}-{number}")
+            first = False
+            yield batch
+
+    def _update_stats(self, batch):
+        self.rows += len(batch)
+        for label, count in batch['sentiment'].value_counts().items():
+            self.sentiment_counts[label] = self.sentiment_counts.get(label, 0) + int(count)
+        for cluster_id, count in batch['cluster'].value_counts().items():
+            self.cluster_counts[int(cluster_id)] = self.cluster_counts.get(int(cluster_id), 0) + int(count)
+        if self.trends is not None:
+            self.trends.update(batch)
+
+    def run(self, batch_size=10000, sample=None):
+        """
+        Streams the dataset through all stages and yields each finished batch.
+        The sentiment model must already be trained.
+        """
+        batches = self._stage(self.collector.iter_batches(batch_size=batch_size, sample=sample))
+        batches = self._stage(self.preprocess_stage(batches))
+        batches = self.feature_stage(batches)
+        batches = self._stage(self.sentiment_stage(batches))
+        batches = self._stage(self.cluster_stage(batches))
+        batches = self.write_stage(batches)
+
+        for batch in batches:
+            self._update_stats(batch)
+            yield batch
+
+    def close(self):
+        """Shuts down the preprocessing pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -1,43 +1,192 @@
 import re
+import os
+import json
 import string
-import nltk
+import functools
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-# Download necessary NLTK data (safe to run multiple times, checks first)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+from src.instrumentation import instrumented
+from src.turkish_stemmer import TurkishStemmer, MixedStemmer
 
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
+# NLTK's Turkish and English stopword lists, bundled so that importing this module
+# never touches nltk (about 1.5s of imports) or the network
+STOPWORDS_PATH = os.path.join(os.path.dirname(__file__), "resources", "stopwords.json")
+
+@functools.lru_cache(maxsize=None)
+def load_stopwords(language):
+    """
+    Stopword set of a language from the bundled resource; languages missing there
+    are read from an installed NLTK stopwords corpus.
+    """
+    try:
+        with open(STOPWORDS_PATH, encoding="utf-8") as f:
+            bundled = json.load(f)
+    except (OSError, ValueError):
+        bundled = {}
+    if language in bundled:
+        return frozenset(bundled[language])
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words(language))
+
+def export_stopwords(languages=("turkish", "english"), path=STOPWORDS_PATH):
+    """
+    Regenerates the bundled resource from the NLTK stopwords corpus.
+    """
+    from nltk.corpus import stopwords
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({language: sorted(set(stopwords.words(language))) for language in languages},
+                  f, ensure_ascii=False, separators=(",", ":"))
+
+class LazyStemmer:
+    """
+    NLTK SnowballStemmer created on the first stem() call. Only stem cache misses
+    reach it, so runs served by a warm cache never import nltk.
+    """
+    def __init__(self, language="english"):
+        self.language = language
+        self.name = f"snowball-{language}"
+        self._stemmer = None
+
+    def stem(self, token):
+        if self._stemmer is None:
+            from nltk.stem.snowball import SnowballStemmer
+            self._stemmer = SnowballStemmer(self.language)
+        return self._stemmer.stem(token)
+
+# Stemmers selectable by name: "mixed" routes each token to the Turkish suffix
+# stemmer or to English Snowball, "english" is Snowball alone
+STEMMERS = {
+    "mixed": lambda: MixedStemmer(english=LazyStemmer("english"), turkish=TurkishStemmer()),
+    "turkish": TurkishStemmer,
+    "english": lambda: LazyStemmer("english"),
+}
+
+# Precompiled patterns used by clean_text (one per cleaning step)
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+MENTION_PATTERN = re.compile(r'@\w+')
+HASHTAG_PATTERN = re.compile(r'#\w+')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+DIGIT_PATTERN = re.compile(r'\d+')
+
+# Mentions, hashtags, punctuation and digits fused into a single pass.
+# URLs stay in their own pass: removing them first changes what '@' and '#'
+# can match (e.g. "@http://x"), so fusing them would not match clean_text.
+NOISE_PATTERN = re.compile(r'@\w+|#\w+|[^\w\s]|\d+')
+
+class StemCache:
+    """
+    Bounded token -> stem memo with least-recently-used eviction.
+    Tweet vocabulary is heavily skewed, so a few thousand entries cover most tokens.
+    """
+    def __init__(self, stemmer, max_size=50000):
+        self.stemmer = stemmer
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def stem(self, token):
+        entries = self.entries
+        stemmed = entries.get(token)
+        if stemmed is not None:
+            entries.move_to_end(token)
+            self.hits += 1
+            return stemmed
+
+        self.misses += 1
+        stemmed = self.stemmer.stem(token)
+        if self.max_size > 0:
+            entries[token] = stemmed
+            if len(entries) > self.max_size:
+                entries.popitem(last=False)
+        return stemmed
+
+    def stats(self):
+        """
+        Returns size and hit/miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def save(self, path):
+        """
+        Writes the entries to a JSON file, least recently used first, tagged with
+        the stemmer's name.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stemmer": self.stemmer.name, "entries": list(self.entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """
+        Loads entries written by save(), keeping the most recent max_size ones.
+        Files written for another stemmer (or in the untagged format of earlier
+        versions) are ignored.
+        """
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if not isinstance(saved, dict) or saved.get("stemmer") != self.stemmer.name:
+            return
+        items = saved["entries"]
+        if self.max_size <= 0:
+            return
+        for token, stemmed in items[-self.max_size:]:
+            self.entries[token] = stemmed
+            self.entries.move_to_end(token)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
 
 class Preprocessor:
-    def __init__(self):
-        self.stop_words_tr = set(stopwords.words('turkish'))
-        self.stop_words_en = set(stopwords.words('english'))
-        # Using English stemmer as a fallback/demo since Turkish stemmers in NLTK are limited/non-existent
-        # Ideally would use Zemberek for Turkish, but that requires Java/heavy setup. 
-        # Using a simple custom suffix stripper for Turkish demo purposes if needed, 
-        # but for now we'll stick to basic normalization and English stemming for mixed content.
-        self.stemmer = SnowballStemmer("english")
+    def __init__(self, stem_cache_size=50000, stem_cache_path=None, stemmer="mixed"):
+        self.stop_words_tr = load_stopwords('turkish')
+        self.stop_words_en = load_stopwords('english')
+        # Single lookup for both languages
+        self.stop_words = self.stop_words_tr | self.stop_words_en
+        # Turkish suffix stripping (src/turkish_stemmer.py) with English tokens routed
+        # to Snowball; NLTK has no Turkish stemmer and Zemberek needs a JVM
+        if stemmer not in STEMMERS:
+            raise ValueError(f"stemmer must be one of {sorted(STEMMERS)}")
+        self.stemmer_name = stemmer
+        self.stemmer = STEMMERS[stemmer]()
+
+        # Memoized stemming; optionally persisted so warm starts skip the work
+        self.stem_cache = StemCache(self.stemmer, max_size=stem_cache_size)
+        self.stem_cache_path = stem_cache_path
+        if stem_cache_path and os.path.exists(stem_cache_path):
+            try:
+                self.stem_cache.load(stem_cache_path)
+            except (OSError, ValueError):
+                pass # A corrupt cache only costs a cold start
+
+    def save_stem_cache(self):
+        """
+        Persists the stem cache to stem_cache_path (no-op when not configured).
+        """
+        if self.stem_cache_path:
+            self.stem_cache.save(self.stem_cache_path)
 
     def clean_text(self, text):
         """
         Removes URLs, mentions, hashtags, and special characters.
         """
         # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+        text = URL_PATTERN.sub('', text)
         # Remove mentions (@user)
-        text = re.sub(r'@\w+', '', text)
+        text = MENTION_PATTERN.sub('', text)
         # Remove hashtags (#tag) - optionally keep the text inside
-        text = re.sub(r'#\w+', '', text) 
+        text = HASHTAG_PATTERN.sub('', text)
         # Remove punctuation and numbers
-        text = re.sub(r'[^\w\s]', '', text)
-        text = re.sub(r'\d+', '', text)
+        text = PUNCTUATION_PATTERN.sub('', text)
+        text = DIGIT_PATTERN.sub('', text)
         return text
 
     def normalize_text(self, text):
@@ -48,7 +197,7 @@ class Preprocessor:
         tokens = text.split() # Simple whitespace tokenizer
         
         # Remove stopwords (checking both TR and EN lists)
-        tokens = [t for t in tokens if t not in self.stop_words_tr and t not in self.stop_words_en]
+        tokens = [t for t in tokens if t not in self.stop_words]
         
         return " ".join(tokens)
 
@@ -57,7 +206,8 @@ class Preprocessor:
         Applies stemming to words.
         """
         tokens = text.split()
-        stemmed_tokens = [self.stemmer.stem(t) for t in tokens]
+        stem = self.stem_cache.stem
+        stemmed_tokens = [stem(t) for t in tokens]
         return " ".join(stemmed_tokens)
 
     def process(self, text):
@@ -69,6 +219,82 @@ class Preprocessor:
         stemmed = self.stem_text(normalized)
         return stemmed
 
+    @instrumented("preprocessor.process_batch", rows=lambda args, result: len(result))
+    def process_batch(self, texts):
+        """
+        Batch version of process() for a pandas Series or any iterable of strings.
+        Cleaning runs as vectorized string operations with the fused patterns and
+        stems go through the shared stem cache. Output matches process().
+        Returns a Series aligned with the input index.
+        """
+        if isinstance(texts, pd.Series):
+            texts = texts.astype(object)
+        else:
+            texts = pd.Series(list(texts), dtype=object)
+
+        # Object dtype keeps Python's re/str semantics, identical to process()
+        cleaned = (
+            texts.str.replace(URL_PATTERN, '', regex=True)
+                 .str.replace(NOISE_PATTERN, '', regex=True)
+                 .str.lower()
+        )
+
+        stop_words = self.stop_words
+        stem = self.stem_cache.stem
+
+        def stem_tokens(tokens):
+            return " ".join([stem(t) for t in tokens if t not in stop_words])
+
+        return cleaned.str.split().map(stem_tokens)
+
+    def open_pool(self, workers=None):
+        """
+        Process pool for process_parallel, kept open by callers that preprocess many
+        batches. Each worker builds its Preprocessor (stopwords, stemmer, stem cache
+        warmed with the current entries) once, when the pool starts.
+        """
+        return ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            initializer=_init_worker,
+            initargs=(self.stem_cache.max_size, list(self.stem_cache.entries.items()), self.stemmer_name)
+        )
+
+    @instrumented("preprocessor.process_parallel", rows=lambda args, result: len(result))
+    def process_parallel(self, texts, workers=None, chunksize=5000, pool=None):
+        """
+        Runs process_batch over chunks of texts on a process pool.
+        Each worker builds its Preprocessor (stopwords, stemmer, warm stem cache) once.
+        With pool (see open_pool) the chunks go to that pool, otherwise a pool is
+        started for this call only. Returns a Series in input order, aligned with the input index.
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        values = list(texts)
+        workers = workers or os.cpu_count() or 1
+
+        if (pool is None and workers <= 1) or len(values) <= chunksize:
+            return self.process_batch(pd.Series(values, index=index, dtype=object))
+
+        chunks = [values[i:i + chunksize] for i in range(0, len(values), chunksize)]
+        if pool is not None:
+            # map() yields results in submission order
+            processed = [text for chunk in pool.map(_process_chunk, chunks) for text in chunk]
+        else:
+            with self.open_pool(min(workers, len(chunks))) as pool:
+                processed = [text for chunk in pool.map(_process_chunk, chunks) for text in chunk]
+
+        return pd.Series(processed, index=index, dtype=object)
+
+# Per-process state for process_parallel workers
+_worker_preprocessor = None
+
+def _init_worker(stem_cache_size, warm_entries, stemmer):
+    global _worker_preprocessor
+    _worker_preprocessor = Preprocessor(stem_cache_size=stem_cache_size, stemmer=stemmer)
+    _worker_preprocessor.stem_cache.entries.update(warm_entries)
+
+def _process_chunk(texts):
+    return _worker_preprocessor.process_batch(texts).tolist()
+
 if __name__ == "__main__":
     p = Preprocessor()
     sample = "Yapay zeka geleceği ele geçirecek mi? Check this out: http://test.com"
@@ -0,0 +1,208 @@
+import os
+import uuid
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.search_index import IndexSegment
+from src.similarity import SimilarityIndex
+from src.instrumentation import instrumented
+
+# Low-cardinality text columns stored dictionary-encoded
+CATEGORICAL_COLUMNS = ["sentiment", "platform", "user"]
+# Dimensions of the pre-aggregated rollup table
+ROLLUP_DIMENSIONS = ["day", "cluster", "sentiment", "user"]
+
+def build_rollup(df):
+    """
+    Counts results by day x cluster x sentiment x user.
+    """
+    days = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    rollup = (
+        df.assign(day=days)
+          .groupby(ROLLUP_DIMENSIONS, observed=True)
+          .size()
+          .reset_index(name="count")
+    )
+    rollup["cluster"] = rollup["cluster"].astype("int32")
+    rollup["count"] = rollup["count"].astype("int64")
+    return rollup
+
+def build_trend_counts(df):
+    """
+    Counts results by hour x cluster x sentiment, the finest TrendEngine granularity.
+    """
+    counts = (
+        df.assign(start=pd.to_datetime(df["date"]).dt.floor("h"))
+          .groupby(["start", "cluster", "sentiment"], observed=True)
+          .size()
+          .reset_index(name="count")
+    )
+    counts["cluster"] = counts["cluster"].astype("int32")
+    counts["sentiment"] = counts["sentiment"].astype(str)
+    counts["count"] = counts["count"].astype("int64")
+    return counts
+
+class ResultsStore:
+    """
+    Columnar store for pipeline results: Parquet files partitioned by day
+    (root/day=YYYY-MM-DD/part-<run>-<n>.parquet). Categorical columns are dictionary
+    encoded, dates and cluster ids keep their dtypes, and readers can load only the
+    columns (and days) they need instead of re-parsing a whole CSV.
+    Every append also writes its rollup counts under root/_rollup/ and an inverted
+    index segment under root/_index/ (both ignored by dataset readers), so dashboards
+    can aggregate groups and search tokens instead of scanning raw rows. Hourly
+    counts for the trend engine go to root/_trends/. Batch runs add a
+    nearest-neighbour index under root/_similar/.
+    """
+    def __init__(self, root="results"):
+        self.root = root
+        self.rollup_root = os.path.join(root, "_rollup")
+        self.similar_root = os.path.join(root, "_similar")
+        self.trends_root = os.path.join(root, "_trends")
+
+    def exists(self):
+        return os.path.isdir(self.root) and any(
+            name.startswith("day=") for name in os.listdir(self.root)
+        )
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+
+    def _to_table(self, df):
+        df = df.copy()
+        df["date"] = pd.to_datetime(df["date"])
+        df["day"] = df["date"].dt.strftime("%Y-%m-%d")
+        for column in CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+        if "cluster" in df.columns:
+            df["cluster"] = df["cluster"].astype("int32")
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    @instrumented("results.append", rows=lambda args, result: len(args[1]))
+    def append(self, df, run_id=None):
+        """
+        Adds rows as new files; existing partitions are never rewritten.
+        """
+        if df.empty:
+            return
+        run_id = run_id or uuid.uuid4().hex[:12]
+        written = []
+        pq.write_to_dataset(
+            self._to_table(df),
+            root_path=self.root,
+            partition_cols=["day"],
+            basename_template=f"part-{run_id}-{{i}}.parquet",
+            file_visitor=lambda written_file: written.append(os.path.relpath(written_file.path, self.root))
+        )
+
+        if "processed_text" in df.columns:
+            # Search index segment over exactly the files this append produced
+            IndexSegment.build(os.path.join(self.root, "_index", run_id), sorted(written), self.root)
+
+        if "cluster" in df.columns and "sentiment" in df.columns:
+            os.makedirs(self.rollup_root, exist_ok=True)
+            rollup = build_rollup(df)
+            pq.write_table(pa.Table.from_pandas(rollup, preserve_index=False),
+                           os.path.join(self.rollup_root, f"part-{run_id}.parquet"))
+            os.makedirs(self.trends_root, exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(build_trend_counts(df), preserve_index=False),
+                           os.path.join(self.trends_root, f"part-{run_id}.parquet"))
+
+    def read(self, columns=None, days=None):
+        """
+        Loads the results, optionally restricted to some columns and days.
+        """
+        filters = [("day", "in", list(days))] if days else None
+        df = pd.read_parquet(self.root, columns=columns, filters=filters)
+        if "day" in df.columns and (columns is None or "day" not in columns):
+            df = df.drop(columns="day")
+        return df
+
+    def read_rollup(self):
+        """
+        Returns the rollup counts merged across appends.
+        """
+        if not os.path.isdir(self.rollup_root):
+            return pd.DataFrame(columns=ROLLUP_DIMENSIONS + ["count"])
+        rollup = pd.read_parquet(self.rollup_root)
+        return rollup.groupby(ROLLUP_DIMENSIONS, observed=True, as_index=False)["count"].sum()
+
+    def read_trend_counts(self):
+        """
+        Returns the hourly trend counts merged across appends.
+        """
+        if not os.path.isdir(self.trends_root):
+            return pd.DataFrame(columns=["start", "cluster", "sentiment", "count"])
+        counts = pd.read_parquet(self.trends_root)
+        return counts.groupby(["start", "cluster", "sentiment"], observed=True, as_index=False)["count"].sum()
+
+    def _filter(self, sentiments=None, clusters=None, search=None):
+        expression = None
+        conditions = []
+        if sentiments is not None:
+            conditions.append(ds.field("sentiment").isin(list(sentiments)))
+        if clusters is not None:
+            conditions.append(ds.field("cluster").isin([int(c) for c in clusters]))
+        if search:
+            conditions.append(pc.match_substring(ds.field("text"), search, ignore_case=True))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def read_page(self, columns, page=0, page_size=100, sentiments=None, clusters=None, search=None):
+        """
+        Reads one page of raw rows matching the filters, scanning only as far as needed.
+        Returns (page DataFrame, total matching rows).
+        """
+        dataset = ds.dataset(self.root, format="parquet", partitioning="hive")
+        expression = self._filter(sentiments, clusters, search)
+        total = dataset.count_rows(filter=expression)
+
+        offset = page * page_size
+        batches = []
+        remaining = page_size
+        for batch in dataset.to_batches(columns=columns, filter=expression):
+            if offset >= batch.num_rows:
+                offset -= batch.num_rows
+                continue
+            batch = batch.slice(offset, remaining)
+            offset = 0
+            batches.append(batch)
+            remaining -= batch.num_rows
+            if remaining <= 0:
+                break
+
+        if batches:
+            page_df = pa.Table.from_batches(batches).to_pandas()
+        else:
+            page_df = pd.DataFrame(columns=columns)
+        return page_df, total
+
+    def read_ids(self, ids, columns=None):
+        """
+        Loads the rows with the given ids (any order).
+        """
+        dataset = ds.dataset(self.root, format="parquet", partitioning="hive")
+        return dataset.to_table(columns=columns, filter=ds.field("id").isin(list(ids))).to_pandas()
+
+    def save_similarity_index(self, index, run_id):
+        index.save(os.path.join(self.similar_root, run_id))
+
+    def similarity_indexes(self):
+        """
+        One SimilarityIndex per batch run; ids are only compared within their own run.
+        """
+        if not os.path.isdir(self.similar_root):
+            return []
+        return [SimilarityIndex.load(os.path.join(self.similar_root, name))
+                for name in sorted(os.listdir(self.similar_root))]
+
+    def days(self):
+        return sorted(name[len("day="):] for name in os.listdir(self.root) if name.startswith("day="))
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+# Compact in-memory layout of pipeline records; one row costs roughly its raw text
+# plus a few dozen bytes instead of one string per column:
+#   id              int64 (random 63-bit, no 36-char uuid string)
+#   date            datetime64
+#   user, platform  category
+#   text            the raw post, as pandas stores strings
+#   processed_text  category (interned: one string per distinct text, int32 codes)
+#   sentiment       category (int8 codes)
+#   cluster         smallest signed int holding the cluster ids (int8 for k <= 127)
+
+def random_ids(rng, n):
+    """
+    n random positive int64 ids. With 63 random bits the chance of any collision
+    stays below 1e-5 up to ten million rows.
+    """
+    return rng.integers(1, np.iinfo(np.int64).max, size=n, dtype=np.int64)
+
+def intern_texts(texts):
+    """
+    Categorical of texts: duplicate texts (retweets, templates, empty strings after
+    preprocessing) share one string object and each row stores an int code.
+    """
+    codes, uniques = pd.factorize(pd.Series(texts), use_na_sentinel=False)
+    return pd.Categorical.from_codes(codes, categories=uniques)
+
+def categorical(values):
+    """
+    Categorical of string labels (sentiments), int8 codes.
+    """
+    return pd.Categorical(np.asarray(values, dtype=object))
+
+def cluster_ids(values):
+    """
+    Cluster ids in the smallest signed integer dtype that holds them.
+    """
+    values = np.asarray(values)
+    if not len(values):
+        return values.astype(np.int8)
+    return values.astype(np.min_scalar_type(-int(values.max()) - 1))
+
+def legacy(df):
+    """
+    The same rows in the previous layout (uuid-formatted string ids, formatted dates,
+    one string per row for labels and processed text, int64 clusters), with string
+    columns in whatever dtype this pandas version infers for them. Used to compare
+    footprints.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column == "id" and values.dtype.kind in "iu":
+            hex_ids = pd.Series([f"{value:032x}" for value in values.to_numpy()], dtype=object)
+            values = (hex_ids.str[:8] + "-" + hex_ids.str[8:12] + "-" + hex_ids.str[12:16] + "-"
+                      + hex_ids.str[16:20] + "-" + hex_ids.str[20:]).to_numpy(dtype=object)
+        elif column == "date":
+            values = pd.to_datetime(values).dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(dtype=object)
+        elif column == "cluster":
+            values = values.to_numpy(dtype=np.int64)
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.to_numpy(dtype=object)
+        columns[column] = values
+    return pd.DataFrame(columns)
+
+def memory_report(layouts):
+    """
+    Deep memory use per column of several layouts of the same rows
+    ({name: DataFrame}). Returns a DataFrame of bytes per row, one column per
+    layout, with a total row.
+    """
+    report = pd.DataFrame({
+        name: df.memory_usage(index=False, deep=True) / max(len(df), 1)
+        for name, df in layouts.items()
+    })
+    report.loc["total"] = report.sum()
+    return report
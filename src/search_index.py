@@ -0,0 +1,135 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+class IndexSegment:
+    """
+    Inverted index over the rows written by one ResultsStore append.
+    Terms are kept sorted (binary search), postings are one concatenated uint32
+    array of row ids with int64 offsets per term, all memory-mapped from .npy files.
+    Row ids count through the segment's Parquet files in order.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.terms = np.load(os.path.join(path, "terms.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.postings = np.load(os.path.join(path, "postings.npy"), mmap_mode="r")
+        with open(os.path.join(path, "files.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.files = manifest["files"]
+        self.sentiment_labels = manifest["sentiments"]
+        # First row id of each file, plus the total row count
+        self.file_starts = np.concatenate([[0], np.cumsum(manifest["rows"])])
+        # Per-row filter columns, so sentiment/cluster filters never touch Parquet
+        self.sentiment_codes = np.load(os.path.join(path, "sentiment.npy"), mmap_mode="r")
+        self.clusters = np.load(os.path.join(path, "cluster.npy"), mmap_mode="r")
+
+    @staticmethod
+    def build(path, files, root):
+        """
+        Indexes the processed_text column of files (paths relative to root).
+        Tokens are the Preprocessor output, so queries must be processed the same way.
+        """
+        tables = [pq.read_table(os.path.join(root, name), columns=["processed_text", "sentiment", "cluster"]).to_pandas()
+                  for name in files]
+        rows = [len(table) for table in tables]
+        if tables:
+            table = pd.concat(tables, ignore_index=True)
+        else:
+            table = pd.DataFrame({"processed_text": [], "sentiment": [], "cluster": []})
+        texts = table["processed_text"]
+        sentiment_codes, sentiment_labels = pd.factorize(table["sentiment"].astype(str))
+
+        # (token, row) pairs, one per distinct token in a row
+        tokens = texts.astype(object).fillna("").astype(str).str.split().explode().dropna()
+        pairs = pd.DataFrame({"term": tokens.to_numpy(dtype=object), "row": tokens.index.to_numpy()})
+        pairs = pairs.drop_duplicates()
+        codes, terms = pd.factorize(pairs["term"], sort=True)
+        order = np.lexsort((pairs["row"].to_numpy(), codes))
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "terms.npy"), np.asarray(terms, dtype=str))
+        np.save(os.path.join(path, "postings.npy"), pairs["row"].to_numpy()[order].astype(np.uint32))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(terms)))]).astype(np.int64)
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+        np.save(os.path.join(path, "sentiment.npy"), sentiment_codes.astype(np.int8))
+        np.save(os.path.join(path, "cluster.npy"), table["cluster"].to_numpy(dtype=np.int32))
+        with open(os.path.join(path, "files.json"), "w", encoding="utf-8") as f:
+            json.dump({"files": files, "rows": rows, "sentiments": list(sentiment_labels)}, f)
+
+    def lookup(self, term):
+        position = np.searchsorted(self.terms, term)
+        if position < len(self.terms) and self.terms[position] == term:
+            return self.postings[self.offsets[position]:self.offsets[position + 1]]
+        return np.empty(0, dtype=np.uint32)
+
+    def search(self, terms):
+        """
+        Row ids containing every term (AND), intersecting the shortest lists first.
+        """
+        postings = sorted((self.lookup(term) for term in set(terms)), key=len)
+        if not postings:
+            return np.empty(0, dtype=np.uint32)
+        result = np.asarray(postings[0])
+        for posting in postings[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+class SearchIndex:
+    """
+    All index segments of a ResultsStore (root/_index/<run>/).
+    """
+    def __init__(self, store):
+        self.store = store
+        self.index_root = os.path.join(store.root, "_index")
+        names = sorted(os.listdir(self.index_root)) if os.path.isdir(self.index_root) else []
+        self.segments = [IndexSegment(os.path.join(self.index_root, name)) for name in names]
+
+    def search(self, terms):
+        """
+        Returns [(segment, row ids)] for rows containing all terms, or None without
+        terms (a query of only stopwords or punctuation): the index cannot answer it.
+        """
+        if not terms:
+            return None
+        return [(segment, segment.search(terms)) for segment in self.segments]
+
+    def read_page(self, hits, columns, page=0, page_size=100, sentiments=None, clusters=None):
+        """
+        Loads one page of the hit rows that also pass the sentiment/cluster filters.
+        Returns (page DataFrame, total matching rows).
+        """
+        matches = []
+        for segment, rows in hits:
+            rows = np.asarray(rows, dtype=np.int64)
+            if sentiments is not None:
+                wanted = [code for code, label in enumerate(segment.sentiment_labels) if label in sentiments]
+                rows = rows[np.isin(segment.sentiment_codes[rows], wanted)]
+            if clusters is not None:
+                rows = rows[np.isin(segment.clusters[rows], list(clusters))]
+            if not len(rows):
+                continue
+            file_numbers = np.searchsorted(segment.file_starts, rows, side="right") - 1
+            for number in np.unique(file_numbers):
+                path = os.path.join(self.store.root, segment.files[number])
+                matches.append((path, rows[file_numbers == number] - segment.file_starts[number]))
+
+        total = sum(len(local) for _, local in matches)
+        start, stop = page * page_size, (page + 1) * page_size
+        frames = []
+        seen = 0
+        for path, local in matches:
+            if seen >= stop:
+                break
+            lo, hi = max(start - seen, 0), min(stop - seen, len(local))
+            if lo < hi:
+                frames.append(pq.read_table(path, columns=columns).take(local[lo:hi]).to_pandas())
+            seen += len(local)
+
+        page_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        return page_df, total
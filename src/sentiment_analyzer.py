@@ -1,17 +1,79 @@
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
+import time
+import numpy as np
 import pandas as pd
 
+from src.model_store import ModelStore
+from src.acquisition import sha256_file
+from src.instrumentation import instrumented
+
+# TurkishTweets.csv emotion labels mapped onto the pipeline's sentiment classes
+LABEL_MAP = {
+    "mutlu": "Positive",
+    "kızgın": "Negative", "kizgin": "Negative",
+    "korku": "Negative",
+    "üzgün": "Negative", "uzgun": "Negative",
+    "surpriz": "Neutral", "sürpriz": "Neutral"
+}
+
 class SentimentAnalyzer:
-    def __init__(self):
+    def __init__(self, model_store=None):
         # Using a pipeline to combine vectorization and classification
         self.model = Pipeline([
             ('vectorizer', CountVectorizer()),
             ('classifier', MultinomialNB())
         ])
         self.is_trained = False
+        # Optional ModelStore; a stored model is only loaded on first predict
+        self.model_store = model_store
+        self._pending = None
+
+    def _fit(self, X, y):
+        """
+        Fits the pipeline, or defers loading an identical stored model until first use.
+        Returns True when the model came from the store.
+        """
+        if self.model_store is not None:
+            key = ModelStore.make_key(zip(X, y), self.model)
+            if self.model_store.exists("sentiment", key):
+                self._pending = ("sentiment", key)
+                self.is_trained = True
+                return True
+
+        self.model.fit(X, y)
+        self._pending = None
+        self.is_trained = True
+        if self.model_store is not None:
+            self.model_store.save("sentiment", key, self.model, params=self.model)
+        return False
+
+    def _ensure_loaded(self):
+        if self._pending is not None:
+            self.model = self.model_store.load(*self._pending)
+            self._pending = None
 
+    @classmethod
+    def from_model(cls, model):
+        """
+        Analyzer around an already fitted pipeline (e.g. one shipped to shard workers).
+        """
+        analyzer = cls()
+        analyzer.model = model
+        analyzer.is_trained = True
+        return analyzer
+
+    def fitted_model(self):
+        """
+        The fitted pipeline, loaded first when it is still deferred in the model store.
+        """
+        if not self.is_trained:
+            raise Exception("Model not trained yet!")
+        self._ensure_loaded()
+        return self.model
+
+    @instrumented("sentiment.train_mock_model")
     def train_mock_model(self):
         """
         Trains the model on a small hardcoded dataset for demonstration purposes.
@@ -41,20 +103,119 @@ class SentimentAnalyzer:
         X = df["text"]
         y = df["sentiment"]
         
-        self.model.fit(X, y)
+        if self._fit(X, y):
+            print("Model loaded from store (mock dataset).")
+        else:
+            print("Model trained on mock dataset.")
+
+    def _iter_labeled(self, path, chunksize, text_column, label_column, preprocessor):
+        """
+        Streams (position, texts, labels) chunks of the labeled CSV.
+        """
+        position = 0
+        for chunk in pd.read_csv(path, usecols=[text_column, label_column], chunksize=chunksize):
+            chunk = chunk.dropna()
+            texts = chunk[text_column].astype(str)
+            if preprocessor is not None:
+                texts = preprocessor.process_batch(texts)
+            labels = chunk[label_column].astype(str).str.strip()
+            labels = labels.map(lambda label: LABEL_MAP.get(label.lower(), label))
+            yield position, texts.to_numpy(dtype=object), labels.to_numpy(dtype=object)
+            position += len(chunk)
+
+    @instrumented("sentiment.train_from_corpus",
+                  rows=lambda args, result: 0 if result.get("from_store") else result["rows_trained"])
+    def train_from_corpus(self, path, chunksize=10000, preprocessor=None, holdout_every=10,
+                          text_column="Tweet", label_column="Etiket", n_features=2**20):
+        """
+        Trains out-of-core on a labeled CSV (e.g. TurkishTweets.csv).
+        Chunks are hashed (no vocabulary to hold in memory) and fed to MultinomialNB.partial_fit,
+        so memory is bounded by chunksize. Every holdout_every-th row is held out and
+        scored in a second pass. Returns a report with throughput and held-out accuracy.
+        """
+        vectorizer = HashingVectorizer(n_features=n_features, alternate_sign=False)
+        classifier = MultinomialNB()
+        # The stemmer is part of the key: a different stemmer means different features
+        params = (vectorizer, classifier, chunksize, holdout_every, text_column, label_column,
+                  preprocessor.stemmer.name if preprocessor is not None else None)
+
+        key = None
+        if self.model_store is not None:
+            # Content, not path/mtime: a copied or touched corpus still hits, an edited one misses
+            key = ModelStore.make_key([sha256_file(path)], params)
+            if self.model_store.exists("sentiment-corpus", key):
+                self._pending = ("sentiment-corpus", key)
+                self.is_trained = True
+                report = dict(self.model_store.read_manifest("sentiment-corpus", key)["metadata"], from_store=True)
+                print(f"Model loaded from store (corpus, held-out accuracy {report['accuracy']:.1%}).")
+                return report
+
+        # Cheap label-only pass: partial_fit needs every class up front
+        classes = set()
+        for chunk in pd.read_csv(path, usecols=[label_column], chunksize=chunksize):
+            labels = chunk[label_column].dropna().astype(str).str.strip()
+            classes.update(LABEL_MAP.get(label.lower(), label) for label in labels.unique())
+        classes = sorted(classes)
+
+        start = time.perf_counter()
+        trained = 0
+        for position, texts, labels in self._iter_labeled(path, chunksize, text_column, label_column, preprocessor):
+            train = np.arange(position, position + len(texts)) % holdout_every != 0
+            if train.any():
+                classifier.partial_fit(vectorizer.transform(texts[train]), labels[train], classes=classes)
+                trained += int(train.sum())
+        elapsed = time.perf_counter() - start
+
+        self.model = Pipeline([
+            ('vectorizer', vectorizer),
+            ('classifier', classifier)
+        ])
+        self._pending = None
         self.is_trained = True
-        print("Model trained on mock dataset.")
+
+        correct = 0
+        held_out = 0
+        for position, texts, labels in self._iter_labeled(path, chunksize, text_column, label_column, preprocessor):
+            test = np.arange(position, position + len(texts)) % holdout_every == 0
+            if test.any():
+                correct += int((self.model.predict(texts[test]) == labels[test]).sum())
+                held_out += int(test.sum())
+
+        report = {
+            "rows_trained": trained,
+            "train_seconds": elapsed,
+            "rows_per_sec": trained / elapsed if elapsed else 0.0,
+            "held_out_rows": held_out,
+            "accuracy": correct / held_out if held_out else 0.0,
+            "classes": classes
+        }
+        if key is not None:
+            self.model_store.save("sentiment-corpus", key, self.model, params=params, metadata=report)
+
+        print(f"Model trained on corpus: {trained} rows at {report['rows_per_sec']:,.0f} rows/sec, "
+              f"held-out accuracy {report['accuracy']:.1%} ({held_out} rows).")
+        return report
 
     def predict(self, text):
         if not self.is_trained:
             raise Exception("Model not trained yet!")
+        self._ensure_loaded()
         
         return self.model.predict([text])[0]
 
-    def predict_batch(self, texts):
+    @instrumented("sentiment.predict_batch", rows=lambda args, result: len(result))
+    def predict_batch(self, texts, features=None):
+        """
+        Predicts a batch of texts. Shared BatchFeatures of the same texts, when given,
+        are projected into the model's vocabulary instead of tokenizing again.
+        """
         if not self.is_trained:
             raise Exception("Model not trained yet!")
-        return self.model.predict(texts)
+        self._ensure_loaded()
+        if features is None:
+            return self.model.predict(texts)
+        matrix = features.project(self.model.named_steps['vectorizer'])
+        return self.model.named_steps['classifier'].predict(matrix)
 
 if __name__ == "__main__":
     analyzer = SentimentAnalyzer()
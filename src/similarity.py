@@ -0,0 +1,201 @@
+import os
+import json
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from src.instrumentation import instrumented
+
+# splitmix64 constants
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+def _splitmix64(x):
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+def random_planes(columns, n_planes, seed=42):
+    """
+    +-1 hyperplane coefficients for the given feature columns, derived by hashing
+    (column, plane) so no dense features x planes matrix is ever stored. Works the
+    same for a 1000-term TF-IDF vocabulary and a 2**18-bucket hashing space.
+    """
+    columns = np.asarray(columns, dtype=np.uint64)[:, None]
+    keys = columns * np.uint64(n_planes) + np.arange(n_planes, dtype=np.uint64)
+    keys ^= _splitmix64(np.full(1, seed, dtype=np.uint64))
+    return np.where(_splitmix64(keys) >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+
+def band_keys(vectors, n_bands=16, band_bits=12, seed=42, chunksize=65536):
+    """
+    Random-projection (SimHash) signatures cut into bands: one band_bits-bit key per
+    row and band. Rows with a high cosine similarity agree on most sign bits, so
+    they share at least one band key with high probability.
+    Returns an (n_rows, n_bands) uint16/uint32 array.
+    """
+    vectors = sp.csr_matrix(vectors)
+    n_planes = n_bands * band_bits
+    # Only the columns actually used get hyperplane coefficients
+    columns, inverse = np.unique(vectors.indices, return_inverse=True)
+    compact = sp.csr_matrix((vectors.data, inverse.ravel(), vectors.indptr), shape=(vectors.shape[0], len(columns)))
+    planes = random_planes(columns, n_planes, seed)
+    weights = (1 << np.arange(band_bits)).astype(np.uint32)
+
+    keys = np.empty((vectors.shape[0], n_bands), dtype=np.uint16 if band_bits <= 16 else np.uint32)
+    for start in range(0, vectors.shape[0], chunksize):
+        bits = np.asarray(compact[start:start + chunksize] @ planes) > 0
+        keys[start:start + chunksize] = bits.reshape(-1, n_bands, band_bits) @ weights
+    return keys
+
+def row_cosines(vectors, rows, others):
+    """
+    Cosine similarity of each (rows[i], others[i]) pair of L2-normalized vectors.
+    """
+    return np.asarray(vectors[rows].multiply(vectors[others]).sum(axis=1)).ravel()
+
+@instrumented("similarity.near_duplicates", rows=lambda args, result: len(result))
+def near_duplicates(vectors, threshold=0.9, keys=None, **band_options):
+    """
+    Groups rows whose L2-normalized vectors have cosine >= threshold.
+    Within every LSH bucket each row is verified against the bucket's first row and
+    its neighbour only, and verified pairs are joined into connected components, so
+    the cost is O(rows x bands) whatever the bucket sizes (a bucket of 100k retweets
+    costs 200k comparisons, not 5 billion). Returns, per row, the index of its group's
+    representative (the group's first row).
+    """
+    vectors = sp.csr_matrix(vectors)
+    n_rows = vectors.shape[0]
+    if keys is None:
+        keys = band_keys(vectors, **band_options)
+
+    sources, targets = [], []
+    n_bands = keys.shape[1]
+    for band in range(n_bands):
+        # Inside a bucket, rows are ordered by the next band's key so that rows
+        # agreeing there too (the likeliest duplicates) end up next to each other
+        order = np.lexsort((keys[:, (band + 1) % n_bands], keys[:, band]))
+        sorted_keys = keys[order, band]
+        same_bucket = sorted_keys[1:] == sorted_keys[:-1]
+        starts = np.flatnonzero(np.r_[True, ~same_bucket])
+        leaders = order[np.repeat(starts, np.diff(np.r_[starts, n_rows]))]
+        # Each row is checked against its bucket's first row and its predecessor
+        candidate = order != leaders
+        rows = np.concatenate([order[candidate], order[1:][same_bucket]])
+        others = np.concatenate([leaders[candidate], order[:-1][same_bucket]])
+        similar = row_cosines(vectors, rows, others) >= threshold
+        sources.append(rows[similar])
+        targets.append(others[similar])
+
+    sources = np.concatenate(sources) if sources else np.empty(0, dtype=np.intp)
+    targets = np.concatenate(targets) if targets else np.empty(0, dtype=np.intp)
+    graph = sp.coo_matrix((np.ones(len(sources), dtype=np.int8), (sources, targets)), shape=(n_rows, n_rows))
+    _, components = connected_components(graph, directed=False)
+
+    # Representative = lowest row index in each component
+    first = np.full(components.max() + 1 if n_rows else 0, n_rows, dtype=np.int64)
+    np.minimum.at(first, components, np.arange(n_rows))
+    return first[components]
+
+class SimilarityIndex:
+    """
+    Approximate nearest-neighbour index over one run's clustering vectors
+    (TopicClusterer TF-IDF rows). Candidates come from the LSH band buckets a row
+    falls into and are re-ranked by exact cosine, so a query touches a few buckets
+    instead of every row. Arrays are saved as .npy files and memory-mapped on load.
+    """
+    def __init__(self, vectors, ids, keys, orders, sorted_keys, id_order=None):
+        self.vectors = vectors
+        self.ids = ids
+        self.keys = keys
+        self.orders = orders
+        self.sorted_keys = sorted_keys
+        # ids sorted once for O(log n) id -> row lookups
+        self.id_order = np.argsort(ids, kind="stable") if id_order is None else id_order
+
+    @classmethod
+    @instrumented("similarity.build", rows=lambda args, result: len(result))
+    def build(cls, vectors, ids, keys=None, **band_options):
+        vectors = sp.csr_matrix(vectors, dtype=np.float32)
+        if keys is None:
+            keys = band_keys(vectors, **band_options)
+        orders = np.argsort(keys, axis=0, kind="stable").T.astype(np.uint32)
+        sorted_keys = np.take_along_axis(keys, orders.T.astype(np.intp), axis=0).T
+        ids = np.asarray(ids)
+        if ids.dtype.kind not in "iu":
+            ids = ids.astype(str).astype("S")
+        return cls(vectors, ids, keys, np.ascontiguousarray(orders), np.ascontiguousarray(sorted_keys))
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def _key(self, tweet_id):
+        # Integer ids (the compact schema) or legacy string ids stored as bytes
+        if self.ids.dtype.kind in "iu":
+            return int(tweet_id)
+        return str(tweet_id).encode()
+
+    def _id(self, row):
+        value = self.ids[row]
+        return value.decode() if isinstance(value, bytes) else int(value)
+
+    def row_of(self, tweet_id):
+        try:
+            tweet_id = self._key(tweet_id)
+        except ValueError:
+            return None
+        position = np.searchsorted(self.ids, tweet_id, sorter=self.id_order)
+        if position < len(self.ids) and self.ids[self.id_order[position]] == tweet_id:
+            return int(self.id_order[position])
+        return None
+
+    def candidates(self, row):
+        """
+        Rows sharing at least one band key with row (row itself excluded).
+        """
+        found = []
+        for band in range(self.keys.shape[1]):
+            key = self.keys[row, band]
+            lo = np.searchsorted(self.sorted_keys[band], key, side="left")
+            hi = np.searchsorted(self.sorted_keys[band], key, side="right")
+            found.append(self.orders[band, lo:hi])
+        found = np.unique(np.concatenate(found)).astype(np.intp)
+        return found[found != row]
+
+    @instrumented("similarity.similar")
+    def similar(self, tweet_id, k=10):
+        """
+        The k most similar tweets to tweet_id as [(id, cosine)], best first.
+        Returns [] when the id is not in this index.
+        """
+        row = self.row_of(tweet_id)
+        if row is None:
+            return []
+        candidates = self.candidates(row)
+        if not len(candidates):
+            return []
+        scores = np.asarray((self.vectors[candidates] @ self.vectors[row].T).todense()).ravel()
+        best = np.argsort(-scores, kind="stable")[:k]
+        return [(self._id(candidates[i]), float(scores[i])) for i in best if scores[i] > 0]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, array in (("data", self.vectors.data), ("indices", self.vectors.indices),
+                            ("indptr", self.vectors.indptr), ("ids", self.ids), ("keys", self.keys),
+                            ("orders", self.orders), ("sorted_keys", self.sorted_keys),
+                            ("id_order", self.id_order)):
+            np.save(os.path.join(path, f"{name}.npy"), array)
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"shape": list(self.vectors.shape)}, f)
+
+    @classmethod
+    def load(cls, path):
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as f:
+            shape = tuple(json.load(f)["shape"])
+        vectors = sp.csr_matrix((array("data"), array("indices"), array("indptr")), shape=shape, copy=False)
+        return cls(vectors, array("ids"), array("keys"), array("orders"), array("sorted_keys"), array("id_order"))
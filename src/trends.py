@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumented
+
+# Bucket widths in seconds
+FREQUENCIES = {"hour": 3600, "day": 86400}
+# Series levels: which of (cluster, sentiment) a series keeps
+LEVELS = {"cell": (True, True), "cluster": (True, False), "sentiment": (False, True), "total": (False, False)}
+
+def to_buckets(dates, seconds):
+    """
+    Bucket numbers (seconds since the epoch // bucket width) of date strings or timestamps.
+    """
+    stamps = pd.to_datetime(pd.Series(dates)).to_numpy("datetime64[s]").astype(np.int64)
+    return stamps // seconds
+
+def _series_keys(cluster, sentiment):
+    # Every event counts towards its cell, its cluster, its sentiment and the total
+    return ((cluster, sentiment), (cluster, None), (None, sentiment), (None, None))
+
+def _level_of(key):
+    cluster, sentiment = key
+    return {(True, True): "cell", (True, False): "cluster",
+            (False, True): "sentiment", (False, False): "total"}[(cluster is not None, sentiment is not None)]
+
+class TrendEngine:
+    """
+    Incremental time-windowed counts per cluster x sentiment (plus cluster, sentiment
+    and overall totals), bucketed by hour or day:
+    - tumbling windows: the count of each bucket,
+    - sliding windows: the count of the last `window` buckets up to the latest one,
+    - burst scores: how far the latest bucket is above its EWMA baseline, in EWMA
+      standard deviations.
+    The EWMA is a linear function of the bucket counts, so an event, even a late one,
+    moves it by a closed-form amount: every update costs O(1) and nothing is recomputed
+    from the history. Moving the latest bucket forward rescales each series once.
+    """
+    def __init__(self, freq="hour", window=24, alpha=0.3):
+        if freq not in FREQUENCIES:
+            raise ValueError(f"freq must be one of {sorted(FREQUENCIES)}")
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+        self.freq = freq
+        self.seconds = FREQUENCIES[freq]
+        self.window = window
+        self.alpha = alpha
+        self.decay = 1 - alpha
+
+        # bucket -> {series key: count}
+        self.buckets = {}
+        self.first = None
+        self.latest = None
+        # series key -> count over the sliding window ending at the latest bucket
+        self.sliding = {}
+        # series key -> [EWMA of counts, EWMA of squared counts], both as of the latest bucket
+        self.ewma = {}
+        self.events = 0
+
+    def __len__(self):
+        return self.events
+
+    def _advance(self, bucket):
+        # Every series decays by one step per elapsed bucket
+        factor = self.decay ** (bucket - self.latest)
+        for state in self.ewma.values():
+            state[0] *= factor
+            state[1] *= factor
+        # Buckets leaving the sliding window (each leaves once)
+        for old in range(self.latest - self.window + 1, min(bucket - self.window, self.latest) + 1):
+            for key, count in self.buckets.get(old, {}).items():
+                self.sliding[key] -= count
+        self.latest = bucket
+
+    def add(self, bucket, cluster, sentiment, count=1):
+        """
+        Adds count events of one cluster and sentiment to a bucket (any order).
+        """
+        bucket = int(bucket)
+        if self.latest is None:
+            self.first = self.latest = bucket
+        elif bucket > self.latest:
+            self._advance(bucket)
+        self.first = min(self.first, bucket)
+
+        age = self.latest - bucket
+        weight = self.alpha * self.decay ** age
+        counts = self.buckets.setdefault(bucket, {})
+        for key in _series_keys(cluster, sentiment):
+            before = counts.get(key, 0)
+            counts[key] = before + count
+            state = self.ewma.get(key)
+            if state is None:
+                state = self.ewma[key] = [0.0, 0.0]
+            state[0] += weight * count
+            # (before + count)^2 - before^2
+            state[1] += weight * (2 * before + count) * count
+            if age < self.window:
+                self.sliding[key] = self.sliding.get(key, 0) + count
+        self.events += count
+
+    @instrumented("trends.update", rows=lambda args, result: len(args[1]))
+    def update(self, df):
+        """
+        Adds pipeline records (date, cluster, sentiment). The batch is counted per
+        bucket x cluster x sentiment first, so the cost is one add() per group.
+        """
+        if df.empty:
+            return self
+        counts = (
+            pd.DataFrame({"bucket": to_buckets(df["date"], self.seconds),
+                          "cluster": df["cluster"].to_numpy(), "sentiment": df["sentiment"].astype(str).to_numpy()})
+              .groupby(["bucket", "cluster", "sentiment"], sort=True)
+              .size()
+        )
+        for (bucket, cluster, sentiment), count in counts.items():
+            self.add(bucket, int(cluster), sentiment, int(count))
+        return self
+
+    @classmethod
+    def from_counts(cls, counts, freq="hour", window=24, alpha=0.3):
+        """
+        Builds an engine from pre-aggregated counts (columns start, cluster, sentiment,
+        count), e.g. ResultsStore.read_trend_counts(). Counts at a finer granularity
+        are summed into the engine's buckets.
+        """
+        engine = cls(freq, window, alpha)
+        if len(counts):
+            grouped = (
+                counts.assign(bucket=to_buckets(counts["start"], engine.seconds), sentiment=counts["sentiment"].astype(str))
+                      .groupby(["bucket", "cluster", "sentiment"], sort=True)["count"]
+                      .sum()
+            )
+            for (bucket, cluster, sentiment), count in grouped.items():
+                if count:
+                    engine.add(bucket, int(cluster), sentiment, int(count))
+        return engine
+
+    def start_of(self, bucket):
+        return pd.Timestamp(int(bucket) * self.seconds, unit="s")
+
+    def _baseline(self, key):
+        """
+        EWMA mean and standard deviation of the series before the latest bucket,
+        bias-corrected for the number of buckets seen so far.
+        """
+        mean, square = self.ewma.get(key, (0.0, 0.0))
+        current = self.buckets.get(self.latest, {}).get(key, 0)
+        # Undo the latest bucket's own term: m_t = a x_t + (1 - a) m_(t-1)
+        mean = (mean - self.alpha * current) / self.decay
+        square = (square - self.alpha * current * current) / self.decay
+        history = self.latest - self.first
+        if history == 0:
+            return np.nan, np.nan
+        correction = 1 - self.decay ** history
+        mean, square = mean / correction, square / correction
+        return mean, np.sqrt(max(square - mean * mean, 0.0))
+
+    def bursts(self, level="cluster"):
+        """
+        Burst scores of the latest bucket for every series of a level
+        ("cell", "cluster", "sentiment" or "total"), strongest first.
+        A series with no history yet scores 0. The deviation is floored at one event
+        so a sparse series does not burst on a single post.
+        """
+        columns = ["cluster", "sentiment", "count", "window_count", "ewma", "std", "burst"]
+        rows = []
+        for key in self.ewma:
+            if _level_of(key) != level:
+                continue
+            count = self.buckets.get(self.latest, {}).get(key, 0)
+            mean, std = self._baseline(key)
+            burst = 0.0 if np.isnan(mean) else (count - mean) / max(std, 1.0)
+            rows.append((key[0], key[1], count, self.sliding.get(key, 0), mean, std, burst))
+        result = pd.DataFrame(rows, columns=columns)
+        keep = [name for name, used in zip(("cluster", "sentiment"), LEVELS[level]) if not used]
+        return result.drop(columns=keep).sort_values("burst", ascending=False, ignore_index=True)
+
+    def _matrix(self, level):
+        """
+        (buckets x series) count matrix of a level from the first to the latest bucket,
+        and the series keys of its columns.
+        """
+        keys = [key for key in self.ewma if _level_of(key) == level]
+        buckets = np.arange(self.first, self.latest + 1) if self.latest is not None else np.empty(0, dtype=np.int64)
+        matrix = np.zeros((len(buckets), len(keys)), dtype=np.int64)
+        positions = {key: column for column, key in enumerate(keys)}
+        for bucket, counts in self.buckets.items():
+            for key, count in counts.items():
+                if key in positions:
+                    matrix[bucket - self.first, positions[key]] = count
+        return pd.DataFrame(matrix, index=buckets), keys
+
+    def _long(self, matrix, keys, level, value):
+        # One row per bucket and series: start, <level keys>, value
+        n_buckets, n_keys = matrix.shape
+        long = pd.DataFrame({"start": pd.to_datetime(np.repeat(matrix.index.to_numpy(), n_keys) * self.seconds, unit="s")})
+        for position, (name, used) in enumerate(zip(("cluster", "sentiment"), LEVELS[level])):
+            if used:
+                long[name] = np.tile(np.array([key[position] for key in keys], dtype=object), n_buckets)
+        long[value] = matrix.to_numpy().ravel()
+        return long
+
+    def counts(self, level="cluster", sliding=False):
+        """
+        Dense time series, one row per bucket and series (empty buckets included):
+        start, <level keys> and count, or with sliding=True the sum over the last
+        `window` buckets instead of the bucket's own count.
+        """
+        matrix, keys = self._matrix(level)
+        if sliding:
+            matrix = matrix.rolling(self.window, min_periods=1).sum().astype(np.int64)
+        return self._long(matrix, keys, level, "count")
+
+    def history(self, level="cluster"):
+        """
+        Burst score of every bucket and series, as bursts() reported when that bucket
+        was the latest one. Recomputed from the bucket counts, for charts.
+        """
+        matrix, keys = self._matrix(level)
+        # adjust=True is the bias-corrected EWMA; shift(1) leaves each bucket out of its own baseline
+        mean = matrix.ewm(alpha=self.alpha, adjust=True).mean().shift(1)
+        square = (matrix ** 2).ewm(alpha=self.alpha, adjust=True).mean().shift(1)
+        std = np.sqrt((square - mean ** 2).clip(lower=0))
+        burst = ((matrix - mean) / std.clip(lower=1.0)).fillna(0.0)
+        return self._long(burst, keys, level, "burst")
@@ -0,0 +1,298 @@
+import re
+from itertools import product
+
+VOWELS = frozenset("aeıioöuü")
+BACK_VOWELS = frozenset("aıou")
+VOICELESS = frozenset("çfhkpsşt")
+# Vowel that a harmonizing suffix vowel takes after a given stem vowel
+A_AFTER = {v: "a" if v in BACK_VOWELS else "e" for v in VOWELS}
+I_AFTER = {"a": "ı", "ı": "ı", "e": "i", "i": "i", "o": "u", "u": "u", "ö": "ü", "ü": "ü"}
+# Consonants softened before a vowel-initial suffix (kitap -> kitabı). c -> ç is left
+# out: restoring it would turn every -CI noun (öğrenci) into öğrenç
+SOFTENED = {"b": "p", "ğ": "k"}
+
+# Inflectional suffixes in two-level notation, grouped by their slot counted from the
+# root: 1 plural/negation, 1.5 participle, 2 possessive, 3 case/tense/verbal noun,
+# 4 person, 5 copula. A = a/e, I = ı/i/u/ü (vowel harmony), D = d/t, C = c/ç,
+# (y)/(n)/(s) = buffer letter used after a vowel. The bare -I of (y)I and (s)I (ev-i,
+# kitab-ı) is stripped after a consonant; the bare -A of (y)A and (n)A is not, since a
+# final a/e is as often part of the root (araba, sıra). The bare conditional -sA is
+# left out for the same reason (masa). Derivational suffixes (-lI, -sIz, -lIk, -CI)
+# are kept: stripping them would merge words with opposite meanings (umutlu / umutsuz).
+SUFFIXES = {
+    1: ["lAr", "mA"],
+    # Participles take possessive and case endings (gelecek-te, geleceğ-i, geldiğ-imiz)
+    1.5: ["(y)AcAk", "(y)AcAğ", "DIk", "DIğ"],
+    2: ["Im", "In", "(s)I", "ImIz", "InIz", "lArI", "(s)In"],
+    3: ["(y)I", "(y)A", "DA", "DAn", "(n)In", "(y)lA", "nDA", "nDAn", "(n)A", "nI", "ki",
+        "Iyor", "mIş", "DI", "mAz", "mAlI", "(y)Ip", "(y)ArAk",
+        "mAk", "mAktA", "(y)IncA", "mAdAn"],
+    4: ["(y)Im", "sIn", "(y)Iz", "sInIz", "lAr", "DIm", "DIn", "DIk", "DInIz", "sAm", "sAn",
+        "sAk", "sAnIz"],
+    5: ["DIr", "(y)DI", "(y)mIş", "(y)sA", "(y)ken", "DIrlAr"],
+}
+
+# Letters and letter groups that do not occur in native Turkish words
+ENGLISH_PATTERN = re.compile(r"[qwx]|th|sh|ch|ck|ph|ee|oo|ou|ea|(?:ing|ed|ly|tion|ness|ment|ful|able|ous|[^aeıioöuü]y)$")
+TURKISH_LETTERS = frozenset("çğıöşü")
+
+# Short vowel-initial endings that most often belong to the root (kedi, kapı, seçim,
+# kadın): they are only stripped from stems of two or more syllables, and never after
+# c/ç, where they are the derivational -CI (öğrenci)
+SHORT_ENDINGS = {"(y)I", "(s)I", "Im", "In", "(s)In", "(n)In", "(y)Im"}
+# Suffixes with the pronominal n, which only follows the possessive -(s)I
+# (evi-ni, evi-nde); başka-nı is başkan-ı
+PRONOMINAL = {"nI", "nDA", "nDAn", "(n)A"}
+# Possessives after a vowel (anne-m, anne-miz): a single m/n ends too many roots
+# (adam, zaman), so they are only stripped from KNOWN_ROOTS
+SHORT_POSSESSIVES = ["m", "n", "mIz", "nIz"]
+# Roots the rules above would cut (türki-ye), that take a short possessive, or that are
+# shorter than min_length (ev-ler, al-dı). Stripping stops when one is reached, and a
+# strip that leaves one is allowed whatever its length
+KNOWN_ROOTS = frozenset([
+    "türkiye", "anne", "baba", "dede", "nine", "abla", "teyze", "hala", "dayı", "amca", "kardeş",
+    "arkadaş", "oda", "araba", "okul", "kafa", "hayat", "para", "dünya",
+    "ev", "iş", "su", "al", "ol",
+])
+
+class SuffixEntry:
+    """
+    One surface form of a suffix with the conditions it puts on the stem before it.
+    """
+    __slots__ = ("rank", "length", "buffered", "after_consonant", "vowel_initial", "harmony", "kind", "voiceless",
+                 "min_syllables", "after_possessive", "after_root")
+
+    def __init__(self, rank, surface, buffered, unbuffered, harmony, kind, voiceless,
+                 min_syllables=1, after_possessive=False, after_root=False):
+        self.rank = rank
+        self.length = len(surface)
+        self.buffered = buffered
+        self.vowel_initial = surface[0] in VOWELS
+        # Vowel-initial forms and the bufferless form of a buffered suffix (okul-la vs
+        # araba-yla) only follow a consonant
+        self.after_consonant = self.vowel_initial or unbuffered
+        # First harmonizing vowel and its archiphoneme ("A" or "I"), or None
+        self.harmony = harmony
+        self.kind = kind
+        # True/False when the first letter is D or C (t/ç after voiceless consonants)
+        self.voiceless = voiceless
+        # See SHORT_ENDINGS, PRONOMINAL and SHORT_POSSESSIVES
+        self.min_syllables = min_syllables
+        self.after_possessive = after_possessive
+        self.after_root = after_root
+
+def expand(template):
+    """
+    All surface forms of a suffix template as
+    (surface, buffered, unbuffered, harmony, kind, voiceless).
+    Vowels after the first harmonizing one follow it, so only well-formed forms are made.
+    """
+    buffer = ""
+    if template.startswith("("):
+        buffer, template = template[1], template[3:]
+    forms = []
+    choices = []
+    for letter in template:
+        if letter == "A":
+            choices.append("ae")
+        elif letter == "I":
+            choices.append("ıiuü")
+        elif letter == "D":
+            choices.append("dt")
+        elif letter == "C":
+            choices.append("cç")
+        else:
+            choices.append(letter)
+    for letters in product(*choices):
+        previous = None
+        harmony = None
+        valid = True
+        for archiphoneme, letter in zip(template, letters):
+            if archiphoneme in "AI":
+                if previous is not None:
+                    expected = (A_AFTER if archiphoneme == "A" else I_AFTER)[previous]
+                    valid = valid and letter == expected
+                elif harmony is None:
+                    harmony = (letter, archiphoneme)
+            if letter in VOWELS:
+                previous = letter
+        if not valid:
+            continue
+        surface = "".join(letters)
+        voiceless = letters[0] in "tç" if template[0] in "DC" else None
+        kind = harmony[1] if harmony else None
+        vowel = harmony[0] if harmony else None
+        forms.append((surface, False, bool(buffer), vowel, kind, voiceless))
+        if buffer:
+            forms.append((buffer + surface, True, False, vowel, kind, None))
+    return forms
+
+def build_trie(suffixes=SUFFIXES):
+    """
+    Reversed-suffix trie: walking a word from its last letter visits every suffix it
+    ends with, longest last. Each node keeps the entries ending there under None.
+    """
+    trie = {}
+
+    def add(surface, entry):
+        node = trie
+        for letter in reversed(surface):
+            node = node.setdefault(letter, {})
+        node.setdefault(None, []).append(entry)
+
+    for rank, templates in suffixes.items():
+        for template in templates:
+            for surface, buffered, unbuffered, harmony, kind, voiceless in expand(template):
+                # Only the bare -I; see SUFFIXES
+                if len(surface) == 1 and kind != "I":
+                    continue
+                short = template in SHORT_ENDINGS and not buffered
+                add(surface, SuffixEntry(rank, surface, buffered, unbuffered, harmony, kind, voiceless,
+                                         min_syllables=2 if short else 1,
+                                         after_possessive=template in PRONOMINAL and surface[0] == "n"))
+    for template in SHORT_POSSESSIVES:
+        for surface, _, _, harmony, kind, _ in expand(template):
+            add(surface, SuffixEntry(2, surface, True, False, harmony, kind, None, after_root=True))
+    # Outer slots first, so equal-length matches leave the most room for further strips
+    stack = [trie]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            if key is None:
+                value.sort(key=lambda entry: -entry.rank)
+            else:
+                stack.append(value)
+    return trie
+
+# Built once at import; a few hundred surface forms
+SUFFIX_TRIE = build_trie()
+
+def last_vowel(word, end):
+    for position in range(end - 1, -1, -1):
+        if word[position] in VOWELS:
+            return word[position]
+    return None
+
+def guess_language(token):
+    """
+    "tr" for tokens with Turkish-only letters, "en" for letters and letter groups
+    foreign to native Turkish words, None when the spelling does not tell.
+    """
+    if not TURKISH_LETTERS.isdisjoint(token):
+        return "tr"
+    if ENGLISH_PATTERN.search(token):
+        return "en"
+    return None
+
+class TurkishStemmer:
+    """
+    Suffix-stripping Turkish stemmer over a precompiled reversed-suffix trie.
+    Suffixes are removed from the end of the word, longest valid match first, as long
+    as each one belongs to an inner slot relative to the previous one (plural <
+    possessive < case < person < copula) and agrees with the remaining stem in vowel
+    harmony, consonant voicing and buffer letters. When the last suffix removed starts
+    with a vowel, a softened consonant is restored (kitabı -> kitab -> kitap). Stems
+    keep at least min_length letters and one vowel; stripping stops at KNOWN_ROOTS.
+    """
+    name = "turkish-suffix-v3"
+
+    def __init__(self, min_length=3, max_strips=5, trie=SUFFIX_TRIE):
+        self.min_length = min_length
+        self.max_strips = max_strips
+        self.trie = trie
+
+    def _accepts(self, entry, word, start):
+        known = word[:start] in KNOWN_ROOTS
+        if start < self.min_length and not known:
+            return False
+        final = word[start - 1]
+        vowel = last_vowel(word, start)
+        if vowel is None:
+            return False
+        if entry.after_root and not known:
+            return False
+        if entry.after_possessive and final not in "ıiuü":
+            return False
+        if entry.min_syllables > 1 and not known and (
+                final in "cç" or sum(letter in VOWELS for letter in word[:start]) < entry.min_syllables):
+            return False
+        if entry.buffered and final not in VOWELS:
+            return False
+        if entry.after_consonant and final in VOWELS:
+            return False
+        if entry.voiceless is not None and entry.voiceless != (final in VOICELESS):
+            return False
+        if entry.harmony is not None:
+            expected = (A_AFTER if entry.kind == "A" else I_AFTER)[vowel]
+            if entry.harmony != expected:
+                return False
+        return True
+
+    def analyze(self, word):
+        """
+        (stem, number of suffixes stripped).
+        """
+        word = word.replace("\u0307", "") # "İ".lower() leaves a combining dot
+        end = len(word)
+        rank = 6
+        vowel_initial = False
+        stripped = 0
+        for _ in range(self.max_strips):
+            if word[:end] in KNOWN_ROOTS:
+                break
+            best = None
+            node = self.trie
+            position = end
+            while position > 0:
+                node = node.get(word[position - 1])
+                if node is None:
+                    break
+                position -= 1
+                for entry in node.get(None, ()):
+                    if entry.rank < rank and self._accepts(entry, word, position):
+                        best = (position, entry)
+                        break
+            if best is None:
+                break
+            end, entry = best
+            rank = entry.rank
+            vowel_initial = entry.vowel_initial
+            stripped += 1
+
+        stem = word[:end]
+        # kitab(ı) -> kitap; single-syllable roots (dağ, bağ) keep their consonant
+        if vowel_initial and stem[-1] in SOFTENED and sum(letter in VOWELS for letter in stem) > 1:
+            stem = stem[:-1] + SOFTENED[stem[-1]]
+        return stem, stripped
+
+    def stem(self, word):
+        return self.analyze(word)[0]
+
+class MixedStemmer:
+    """
+    Routes each token to the Turkish suffix stemmer or to an English stemmer
+    (Snowball by default, created lazily). Tokens whose spelling does not tell
+    (guess_language() is None) stay Turkish unless no Turkish suffix comes off, they
+    end in -s (no Turkish suffix does) and English finds an ending there (players,
+    tokens). Vowel harmony is not used: loanwords (kitap, piyasa) and -Iyor break it.
+    """
+    def __init__(self, english=None, turkish=None):
+        if english is None:
+            from src.preprocessor import LazyStemmer
+            english = LazyStemmer("english")
+        self.english = english
+        self.turkish = turkish or TurkishStemmer()
+        self.name = f"{self.turkish.name}+{getattr(self.english, 'name', 'english')}"
+
+    def stem(self, token):
+        language = guess_language(token)
+        if language == "en":
+            return self.english.stem(token)
+        if language == "tr":
+            return self.turkish.stem(token)
+        stem, stripped = self.turkish.analyze(token)
+        if not stripped and token[-1] == "s":
+            english = self.english.stem(token)
+            if english != token:
+                return english
+        return stem